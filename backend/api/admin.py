@@ -0,0 +1,38 @@
+import hmac
+from dataclasses import asdict
+from datetime import date
+
+from fastapi import APIRouter, Header, HTTPException
+
+from backend.config import settings
+from backend.services.deletion import count_rounds, purge_rounds
+
+router = APIRouter()
+
+
+def check_admin_token(authorization: str | None) -> None:
+    """Reject requests without the ADMIN_TOKEN bearer; 404 if no token is configured."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404)
+    expected = f"Bearer {settings.admin_token}"
+    if not authorization or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.delete("/api/admin/rounds")
+def purge(
+    user: str | None = None,
+    is_seed: bool | None = None,
+    since: date | None = None,
+    until: date | None = None,
+    dry_run: bool = False,
+    authorization: str | None = Header(None),
+):
+    """Delete rounds by user, seed flag and/or date range, with their holes and putts."""
+    check_admin_token(authorization)
+    criteria = {"user": user, "is_seed": is_seed, "since": since, "until": until}
+    try:
+        result = count_rounds(**criteria) if dry_run else purge_rounds(**criteria)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"dry_run": dry_run, **asdict(result)}
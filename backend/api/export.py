@@ -0,0 +1,28 @@
+from typing import Literal
+
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from backend.api.admin import check_admin_token
+from backend.services.exporter import MEDIA_TYPES, STREAMERS, iter_round_records
+
+router = APIRouter()
+
+
+@router.get("/api/export")
+def export_rounds(
+    user: str | None = None,
+    include_seed: bool = False,
+    format: Literal["json", "ndjson", "csv"] = "ndjson",
+    authorization: str | None = Header(None),
+):
+    """Stream a player's rounds; every player's needs the admin token."""
+    if user is None:
+        check_admin_token(authorization)
+    records = iter_round_records(user=user, include_seed=include_seed)
+    filename = f"rounds-{user or 'all'}.{format}"
+    return StreamingResponse(
+        STREAMERS[format](records),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
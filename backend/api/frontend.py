@@ -0,0 +1,185 @@
+"""Serves the dashboard frontend from fingerprinted, precompressed assets.
+
+On the first request every file under frontend/ is read into memory once. Assets other
+than HTML pages also get a content-hashed name (css/dashboard.3f9a1c2b7e4d.css)
+that the pages are rewritten to reference, and every text file is gzip and
+brotli compressed ahead of time, so a request only picks a stored variant by
+Accept-Encoding:
+
+- hashed names are cached for a year as immutable, since any change to the
+  file changes its name
+- pages and the original names are revalidated on every visit, which a
+  matching ETag answers with a 304
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import posixpath
+import re
+from dataclasses import dataclass, replace
+from mimetypes import guess_type
+from pathlib import Path
+
+import brotli
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+COMPRESSIBLE = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+COMPRESSORS = {
+    "br": lambda body: brotli.compress(body, quality=11),
+    "gzip": lambda body: gzip.compress(body, compresslevel=9, mtime=0),
+}
+PREFERENCE = ("br", "gzip")
+
+_REFERENCE = re.compile(r'\b(src|href)="([^"]+)"')
+
+
+@dataclass
+class Asset:
+    media_type: str
+    cache_control: str
+    # Content coding ("identity", "gzip", "br") -> (body, strong ETag)
+    variants: dict[str, tuple[bytes, str]]
+
+
+def _asset(path: str, body: bytes, cache_control: str) -> Asset:
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    variants = {"identity": (body, f'"{digest}"')}
+    if posixpath.splitext(path)[1] in COMPRESSIBLE:
+        for encoding, compress in COMPRESSORS.items():
+            packed = compress(body)
+            if len(packed) < len(body):
+                variants[encoding] = (packed, f'"{digest}-{encoding}"')
+    media_type = guess_type(path)[0] or "application/octet-stream"
+    return Asset(media_type, cache_control, variants)
+
+
+def _hashed_name(path: str, asset: Asset) -> str:
+    digest = asset.variants["identity"][1].strip('"')
+    stem, suffix = posixpath.splitext(path)
+    return f"{stem}.{digest}{suffix}"
+
+
+def _rewrite_references(page: str, html: str, hashed: dict[str, str]) -> str:
+    """Point src/href attributes that name a fingerprinted asset at its hashed name."""
+    base = posixpath.dirname(page)
+
+    def sub(match: re.Match) -> str:
+        attr, ref = match.groups()
+        target = ref[1:] if ref.startswith("/") else posixpath.join(base, ref)
+        target = posixpath.normpath(target)
+        if target not in hashed:
+            return match.group(0)
+        prefix = ref[: len(ref) - len(posixpath.basename(ref))]
+        return f'{attr}="{prefix}{posixpath.basename(hashed[target])}"'
+
+    return _REFERENCE.sub(sub, html)
+
+
+def build_assets(directory: str) -> dict[str, Asset]:
+    """Read, fingerprint and compress every file under directory, keyed by URL path."""
+    root = Path(directory)
+    files = {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+    assets: dict[str, Asset] = {}
+    hashed: dict[str, str] = {}
+    for path, body in files.items():
+        if path.endswith(".html"):
+            continue
+        asset = _asset(path, body, IMMUTABLE)
+        hashed[path] = _hashed_name(path, asset)
+        assets[hashed[path]] = asset
+        assets[path] = replace(asset, cache_control=REVALIDATE)
+
+    for path, body in files.items():
+        if path.endswith(".html"):
+            html = _rewrite_references(path, body.decode(), hashed)
+            assets[path] = _asset(path, html.encode(), REVALIDATE)
+    return assets
+
+
+def _negotiate(accept_encoding: str, available: dict) -> str:
+    """Pick the stored content coding to send for an Accept-Encoding header."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in PREFERENCE:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class FrontendFiles:
+    """ASGI app serving the frontend; a stand-in for StaticFiles(html=True).
+
+    The assets are built on the first request rather than at startup, so a
+    cold start serving /api/stats doesn't wait for the compression. The
+    build runs once, in the threadpool, so other requests keep being served
+    while the first frontend requests wait for it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.assets: dict[str, Asset] | None = None
+        self._building = asyncio.Lock()
+
+    def build(self) -> None:
+        self.assets = build_assets(self.directory)
+        logger.info(f"Frontend assets built: {len(self.assets)} paths")
+
+    def _response(self, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return PlainTextResponse(
+                "Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"}
+            )
+        path = scope["path"][len(scope.get("root_path", "")):].lstrip("/")
+        if path == "" or path.endswith("/"):
+            path += "index.html"
+        asset = self.assets.get(path)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        request_headers = Headers(scope=scope)
+        encoding = _negotiate(request_headers.get("accept-encoding", ""), asset.variants)
+        body, etag = asset.variants[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if etag in request_headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if self.assets is None:
+            async with self._building:
+                if self.assets is None:
+                    await run_in_threadpool(self.build)
+        await self._response(scope)(scope, receive, send)
@@ -0,0 +1,60 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.services.metrics import (
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_QUERIES,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    render,
+    traced,
+)
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
+
+
+def _route(scope) -> str:
+    # The route template, not the raw path, keeps the number of series fixed
+    route = scope.get("route")
+    return getattr(route, "path", None) or "static"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and counting its DB statements.
+
+    The request is measured until its last body chunk is sent, so streamed
+    responses such as exports count in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with traced() as trace:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = _route(scope)
+                HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status)
+                HTTP_REQUEST_SECONDS.observe(trace.elapsed, route=route)
+                HTTP_REQUEST_QUERIES.observe(trace.queries, route=route)
+                HTTP_REQUEST_DB_SECONDS.observe(trace.db_seconds, route=route)
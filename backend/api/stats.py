@@ -1,10 +1,142 @@
-from fastapi import APIRouter
+import hashlib
+from datetime import date
 
-from backend.services.stats_service import compute_stats
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from backend.services.baselines import parse_baselines
+from backend.services.live import live_stats
+from backend.services.stats_cache import stats_cache
+from backend.services.stats_service import compute_stats, stats_from_tally
+from backend.services.trends import DEFAULT_WINDOW, compute_trends
+from backend.services.windows import build_series
+from backend.storage.database import get_data_version, get_read_session
 
 router = APIRouter()
 
 
+def _etag(version: int, *scope) -> str:
+    digest = hashlib.sha1(repr(scope).encode()).hexdigest()[:12]
+    return f'"{version}-{digest}"'
+
+
+def _baselines(baseline: str | None) -> tuple[str, ...]:
+    try:
+        return parse_baselines(baseline)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _window_stats(
+    user: str | None,
+    include_seed: bool,
+    version: int,
+    baselines: tuple[str, ...],
+    last_n_rounds: int | None,
+    since: date | None,
+    until: date | None,
+) -> dict:
+    """Stats for a window of rounds from the cached per-round prefix sums."""
+
+    def series():
+        with get_read_session() as session:
+            return build_series(session, user, include_seed)
+
+    rounds = stats_cache.get_or_compute(("series", user, include_seed, version), series)
+    return stats_from_tally(rounds.window(last_n_rounds, since, until), baselines)
+
+
+def _scope_stats(
+    user: str | None,
+    include_seed: bool,
+    version: int,
+    baselines: tuple[str, ...],
+    last_n_rounds: int | None = None,
+    since: date | None = None,
+    until: date | None = None,
+) -> dict:
+    """The /api/stats payload for a scope at a data version, from the cache if computed."""
+    window = (last_n_rounds, since, until)
+    if any(w is not None for w in window):
+        return _window_stats(user, include_seed, version, baselines, *window)
+    return stats_cache.get_or_compute(
+        (user, include_seed, baselines, version),
+        lambda: compute_stats(user=user, include_seed=include_seed, baseline=baselines),
+    )
+
+
 @router.get("/api/stats")
-def get_stats():
-    return compute_stats()
+def get_stats(
+    request: Request,
+    response: Response,
+    user: str | None = None,
+    include_seed: bool = True,
+    last_n_rounds: int | None = Query(None, ge=1),
+    since: date | None = None,
+    until: date | None = None,
+    baseline: str | None = None,
+):
+    """Dashboard stats. `baseline` is an SG baseline or a comma-separated list of them."""
+    baselines = _baselines(baseline)
+    version = get_data_version()
+    window = (last_n_rounds, since, until)
+    etag = _etag(version, user, include_seed, baselines, *window)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    stats = _scope_stats(user, include_seed, version, baselines, *window)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return stats
+
+
+@router.get("/api/stats/live")
+async def get_live_stats(
+    user: str | None = None,
+    include_seed: bool = True,
+    last_n_rounds: int | None = Query(None, ge=1),
+    since: date | None = None,
+    until: date | None = None,
+    baseline: str | None = None,
+):
+    """Server-Sent Events: the stats for the scope, then only what changes."""
+    baselines = _baselines(baseline)
+    scope = (user, include_seed, baselines, last_n_rounds, since, until)
+
+    def compute(version: int) -> dict:
+        return _scope_stats(user, include_seed, version, baselines, last_n_rounds, since, until)
+
+    return StreamingResponse(
+        live_stats.stream(scope, compute),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/trends")
+def get_trends(
+    request: Request,
+    response: Response,
+    user: str | None = None,
+    include_seed: bool = True,
+    window: int = Query(DEFAULT_WINDOW, ge=1),
+    max_points: int | None = Query(None, ge=1),
+    baseline: str | None = None,
+):
+    """Trend series; SG is against `baseline` (the first, if several are given)."""
+    baseline = _baselines(baseline)[0]
+    version = get_data_version()
+    etag = _etag(version, "trends", user, include_seed, window, max_points, baseline)
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    def trends():
+        with get_read_session() as session:
+            return compute_trends(session, user, include_seed, window, max_points, baseline)
+
+    result = stats_cache.get_or_compute(
+        ("trends", user, include_seed, window, max_points, baseline, version), trends
+    )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return result
@@ -0,0 +1,75 @@
+"""Durable bot conversations with coalesced writes.
+
+Handlers record each player's conversation state and user_data after every
+tap, but only in memory: a background task flushes whatever changed every
+`conversation_flush_seconds` in a single transaction, so a burst of taps
+costs one write. Saved conversations are loaded lazily, one player at a
+time, when they next tap a button (see handlers.resume_round), so startup
+doesn't depend on how many rounds are in progress.
+"""
+
+import asyncio
+import copy
+import logging
+
+from telegram.ext import ConversationHandler
+
+from backend.config import settings
+from backend.storage.conversations import Saved, load_state, save_states
+from backend.storage.executor import run_db
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore:
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._dirty: dict[str, Saved] = {}
+        self._task: asyncio.Task | None = None
+
+    def record(self, telegram_user_id: str, state: int, user_data: dict) -> None:
+        """Mark a player's conversation as changed. Ended conversations are deleted."""
+        if state == ConversationHandler.END:
+            self._dirty[telegram_user_id] = None
+        else:
+            self._dirty[telegram_user_id] = (state, copy.deepcopy(dict(user_data)))
+
+    async def load(self, telegram_user_id: str) -> Saved:
+        if telegram_user_id in self._dirty:
+            return self._dirty[telegram_user_id]
+        return await run_db(load_state, telegram_user_id)
+
+    async def flush(self) -> int:
+        """Write all pending changes in one transaction. Returns conversations written."""
+        if not self._dirty:
+            return 0
+        batch, self._dirty = self._dirty, {}
+        try:
+            await run_db(save_states, batch)
+        except Exception:
+            # Keep anything not superseded by a newer tap for the next flush
+            self._dirty = {**batch, **self._dirty}
+            raise
+        return len(batch)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="conversation-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to save conversations, will retry")
+
+
+conversation_store = ConversationStore(settings.conversation_flush_seconds)
@@ -1,7 +1,7 @@
+import functools
 import logging
-from datetime import date
-
 from telegram import Update
+from telegram.request import BaseRequest
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -11,23 +11,74 @@ from telegram.ext import (
 )
 
 from backend.config import settings
+from backend.bot.conversation_store import conversation_store
 from backend.bot.keyboards import distance_keyboard, gir_keyboard, holes_keyboard
-from backend.storage.database import Hole, Putt, Round, get_session
+from backend.services.live import live_stats
+from backend.services.metrics import (
+    BOT_HANDLER_ERRORS,
+    BOT_HANDLER_QUERIES,
+    BOT_HANDLER_SECONDS,
+    traced,
+)
+from backend.storage.executor import run_db
+from backend.storage.round_log import (
+    create_round,
+    delete_round,
+    round_progress,
+    save_hole,
+    write_stats,
+)
 
 logger = logging.getLogger(__name__)
 
+
+def _instrumented(callback):
+    """Record a handler's duration, DB statements and errors in the metrics."""
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        with traced() as trace:
+            try:
+                return await callback(update, context)
+            except Exception:
+                BOT_HANDLER_ERRORS.inc(handler=name)
+                raise
+            finally:
+                BOT_HANDLER_SECONDS.observe(trace.elapsed, handler=name)
+                BOT_HANDLER_QUERIES.observe(trace.queries, handler=name)
+
+    return wrapper
+
+
 # Conversation states
 HOLE_COUNT, FIRST_PUTT, GIR_SELECT, NEXT_PUTT = range(4)
 
 # User data keys
 ROUND_ID = "round_id"
 HOLE_NUM = "hole_num"
-HOLE_ID = "hole_id"
+HOLE_GIR = "hole_gir"
+HOLE_PUTTS = "hole_putts"
 PUTT_NUM = "putt_num"
 TOTAL_PUTTS = "total_putts"
 TOTAL_HOLES = "total_holes"
+FIRST_DISTANCE = "first_putt_distance"
+# Everything that belongs to the round being logged
+ROUND_KEYS = (
+    ROUND_ID, HOLE_NUM, HOLE_GIR, HOLE_PUTTS, PUTT_NUM, TOTAL_PUTTS, TOTAL_HOLES, FIRST_DISTANCE,
+)
+
+# States in which a round exists and a hole may be half logged
+LOGGING_STATES = (FIRST_PUTT, GIR_SELECT, NEXT_PUTT)
 
 
+def _clear_round(context) -> None:
+    """Forget the round in user_data, so /cancel can't reach a finished round."""
+    for key in ROUND_KEYS:
+        context.user_data.pop(key, None)
+
+
+@_instrumented
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show help message."""
     await update.message.reply_text(
@@ -39,12 +90,15 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "1. Select 1st putt distance\n"
         "2. Select GIR / Non-GIR\n"
         "3. Select next putt distance, or Made It! if the previous putt went in\n"
-        "4. Repeat until the round is complete"
+        "4. Repeat until the round is complete\n\n"
+        f"Your own stats: open the dashboard with ?user={update.effective_user.id}"
     )
 
 
+@_instrumented
 async def start_round(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start a new round via /round command."""
+    _clear_round(context)
     await update.message.reply_text(
         "How many holes?",
         reply_markup=holes_keyboard(),
@@ -52,6 +106,7 @@ async def start_round(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     return HOLE_COUNT
 
 
+@_instrumented
 async def hole_count_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle 9 or 18 hole selection."""
     query = update.callback_query
@@ -60,12 +115,7 @@ async def hole_count_selected(update: Update, context: ContextTypes.DEFAULT_TYPE
     total_holes = int(query.data.replace("holes:", ""))
     user_id = str(update.effective_user.id)
 
-    with get_session() as session:
-        round_obj = Round(telegram_user_id=user_id, date=date.today())
-        session.add(round_obj)
-        session.commit()
-        session.refresh(round_obj)
-        round_id = round_obj.id
+    round_id = await run_db(create_round, user_id)
 
     context.user_data[ROUND_ID] = round_id
     context.user_data[HOLE_NUM] = 1
@@ -80,6 +130,7 @@ async def hole_count_selected(update: Update, context: ContextTypes.DEFAULT_TYPE
     return FIRST_PUTT
 
 
+@_instrumented
 async def first_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle 1st putt distance selection."""
     query = update.callback_query
@@ -87,33 +138,15 @@ async def first_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     distance = query.data.replace("dist:", "")
     hole_num = context.user_data[HOLE_NUM]
-    round_id = context.user_data[ROUND_ID]
-
-    with get_session() as session:
-        hole = Hole(round_id=round_id, hole_number=hole_num, gir=False)
-        session.add(hole)
-        session.commit()
-        session.refresh(hole)
-        hole_id = hole.id
 
-    context.user_data[HOLE_ID] = hole_id
+    # The hole is kept in user_data and written in one go once it is finished
+    context.user_data[HOLE_PUTTS] = [distance]
     context.user_data[PUTT_NUM] = 1
-    context.user_data["first_putt_distance"] = distance
-
-    # Record the 1st putt
-    with get_session() as session:
-        putt = Putt(hole_id=hole_id, putt_number=1, distance=distance)
-        session.add(putt)
-        session.commit()
+    context.user_data[FIRST_DISTANCE] = distance
 
     if distance == "Gimmie":
         # Gimmie = 1 putt, made it, ask GIR
         context.user_data[TOTAL_PUTTS] += 1
-        with get_session() as session:
-            hole = session.get(Hole, hole_id)
-            hole.putts_taken = 1
-            session.add(hole)
-            session.commit()
         await query.edit_message_text(
             f"Hole {hole_num}: Gimmie (1 putt)\n\nGreen in regulation?",
             reply_markup=gir_keyboard(),
@@ -128,27 +161,23 @@ async def first_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE
     return GIR_SELECT
 
 
+@_instrumented
 async def gir_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle GIR selection."""
     query = update.callback_query
     await query.answer()
 
     gir = query.data == "gir:yes"
-    hole_id = context.user_data[HOLE_ID]
     hole_num = context.user_data[HOLE_NUM]
-    first_distance = context.user_data["first_putt_distance"]
-    total_holes = context.user_data[TOTAL_HOLES]
-
-    with get_session() as session:
-        hole = session.get(Hole, hole_id)
-        hole.gir = gir
-        session.add(hole)
-        session.commit()
+    first_distance = context.user_data[FIRST_DISTANCE]
+    context.user_data[HOLE_GIR] = gir
 
     gir_text = "GIR" if gir else "Non-GIR"
 
     if first_distance == "Gimmie":
-        # Already recorded 1 putt, move to next hole
+        # Gimmie holes are complete once GIR is known
+        if not await _save_hole(context, putts_taken=1):
+            return await _round_gone(query, context)
         return await _advance_hole(query, context)
 
     # Ask for 2nd putt
@@ -161,13 +190,13 @@ async def gir_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     return NEXT_PUTT
 
 
+@_instrumented
 async def next_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle 2nd+ putt distance selection."""
     query = update.callback_query
     await query.answer()
 
     distance = query.data.replace("dist:", "")
-    hole_id = context.user_data[HOLE_ID]
     hole_num = context.user_data[HOLE_NUM]
     putt_num = context.user_data[PUTT_NUM]
 
@@ -176,18 +205,12 @@ async def next_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE)
         # e.g. at 2nd putt prompt, Made It = 1st putt was made = 1 putt total
         actual_putts = putt_num - 1
         context.user_data[TOTAL_PUTTS] += actual_putts
-        with get_session() as session:
-            hole = session.get(Hole, hole_id)
-            hole.putts_taken = actual_putts
-            session.add(hole)
-            session.commit()
+        if not await _save_hole(context, putts_taken=actual_putts):
+            return await _round_gone(query, context)
         return await _advance_hole(query, context)
     else:
         # Record the putt and ask for next
-        with get_session() as session:
-            putt = Putt(hole_id=hole_id, putt_number=putt_num, distance=distance)
-            session.add(putt)
-            session.commit()
+        context.user_data[HOLE_PUTTS].append(distance)
 
         context.user_data[PUTT_NUM] = putt_num + 1
         await query.edit_message_text(
@@ -198,6 +221,32 @@ async def next_putt_selected(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return NEXT_PUTT
 
 
+async def _save_hole(context, putts_taken: int) -> bool:
+    """Write the finished hole held in user_data in a single transaction.
+
+    Returns False if the round was deleted in the meantime.
+    """
+    hole_id = await run_db(
+        save_hole,
+        context.user_data[ROUND_ID],
+        context.user_data[HOLE_NUM],
+        context.user_data[HOLE_GIR],
+        context.user_data[HOLE_PUTTS],
+        putts_taken,
+    )
+    if hole_id is None:
+        return False
+    live_stats.notify()
+    return True
+
+
+async def _round_gone(query, context) -> int:
+    """End a conversation whose round was deleted while it was being logged."""
+    context.user_data.clear()
+    await query.edit_message_text("That round was cancelled. Send /round to start a new one.")
+    return ConversationHandler.END
+
+
 async def _advance_hole(query, context, gir_text: str = "") -> int:
     """Move to the next hole or finish the round."""
     hole_num = context.user_data[HOLE_NUM]
@@ -206,6 +255,8 @@ async def _advance_hole(query, context, gir_text: str = "") -> int:
 
     if hole_num >= total_holes:
         # Round complete
+        logger.info("Round complete, bot write path: %s", write_stats.per_hole())
+        _clear_round(context)
         await query.edit_message_text(
             f"Round complete! {total_putts} total putts in {total_holes} holes.\n\n"
             f"View your dashboard to see updated stats."
@@ -223,25 +274,61 @@ async def _advance_hole(query, context, gir_text: str = "") -> int:
     return FIRST_PUTT
 
 
+@_instrumented
+async def resume_round(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Pick up a saved conversation when a button is tapped with none in memory.
 
+    This is how rounds survive a restart: the player's state and user_data
+    are loaded on their first tap, and the tap is handled as if the bot had
+    never stopped.
+    """
+    query = update.callback_query
+    user_id = str(update.effective_user.id)
+    saved = await conversation_store.load(user_id)
+    if saved is None:
+        await query.answer("No round in progress. Send /round to start one.")
+        return ConversationHandler.END
+
+    state, data = saved
+    context.user_data.clear()
+    context.user_data.update(data)
+
+    round_id = context.user_data.get(ROUND_ID)
+    if state in LOGGING_STATES and round_id is not None:
+        progress = await run_db(round_progress, round_id)
+        if progress is None:
+            context.user_data.clear()
+            await query.answer("That round was cancelled. Send /round to start a new one.")
+            return ConversationHandler.END
+        holes_logged, total_putts = progress
+        if holes_logged >= context.user_data[HOLE_NUM]:
+            # The hole was written but the bot stopped before its state was saved
+            context.user_data[HOLE_NUM] = holes_logged
+            context.user_data[TOTAL_PUTTS] = total_putts
+            await query.answer()
+            return await _advance_hole(query, context)
+
+    for pattern, callback in RESUME_HANDLERS[state]:
+        if query.data.startswith(pattern):
+            return await callback(update, context)
+
+    # A button from an older message; keep the saved state
+    await query.answer("Please use the buttons on the latest message.")
+    return state
+
+
+@_instrumented
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel the current round. All data is discarded."""
     round_id = context.user_data.get(ROUND_ID)
+    if round_id is None:
+        # No conversation in memory; there may be a saved one
+        saved = await conversation_store.load(str(update.effective_user.id))
+        round_id = saved[1].get(ROUND_ID) if saved else None
 
     if round_id:
-        with get_session() as session:
-            from sqlmodel import select
-            all_holes = session.exec(
-                select(Hole).where(Hole.round_id == round_id)
-            ).all()
-            for hole in all_holes:
-                for putt in hole.putts:
-                    session.delete(putt)
-                session.delete(hole)
-            round_obj = session.get(Round, round_id)
-            if round_obj:
-                session.delete(round_obj)
-            session.commit()
+        await run_db(delete_round, round_id)
+        live_stats.notify()
         await update.message.reply_text("Round cancelled. No data saved.")
     else:
         await update.message.reply_text("No round in progress.")
@@ -250,27 +337,62 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return ConversationHandler.END
 
 
-def build_bot_app() -> Application:
-    """Build and return the telegram bot Application."""
-    app = Application.builder().token(settings.telegram_bot_token).build()
+# Callback data prefix -> handler, per conversation state
+RESUME_HANDLERS = {
+    HOLE_COUNT: [("holes:", hole_count_selected)],
+    FIRST_PUTT: [("dist:", first_putt_selected)],
+    GIR_SELECT: [("gir:", gir_selected)],
+    NEXT_PUTT: [("dist:", next_putt_selected)],
+}
+
+
+def _persisted(callback):
+    """Record the conversation state a handler moves to, for conversation_store."""
+
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        state = await callback(update, context)
+        conversation_store.record(str(update.effective_user.id), state, context.user_data)
+        return state
+
+    return wrapper
+
+
+def build_bot_app(request: BaseRequest | None = None) -> Application:
+    """Build and return the telegram bot Application.
+
+    `request` replaces the HTTP client used for Bot API calls, e.g. with a stub.
+    """
+    builder = Application.builder().token(settings.telegram_bot_token)
+    if settings.telegram_api_url:
+        builder = builder.base_url(f"{settings.telegram_api_url}/bot")
+        builder = builder.base_file_url(f"{settings.telegram_api_url}/file/bot")
+    if request is not None:
+        builder = builder.request(request)
+    app = builder.build()
 
     conv_handler = ConversationHandler(
-        entry_points=[CommandHandler("round", start_round)],
+        entry_points=[
+            CommandHandler("round", _persisted(start_round)),
+            # Buttons tapped with no conversation in memory, e.g. after a restart
+            CallbackQueryHandler(_persisted(resume_round), pattern=r"^(holes|dist|gir):"),
+            CommandHandler("cancel", _persisted(cancel)),
+        ],
         states={
             HOLE_COUNT: [
-                CallbackQueryHandler(hole_count_selected, pattern=r"^holes:"),
+                CallbackQueryHandler(_persisted(hole_count_selected), pattern=r"^holes:"),
             ],
             FIRST_PUTT: [
-                CallbackQueryHandler(first_putt_selected, pattern=r"^dist:"),
+                CallbackQueryHandler(_persisted(first_putt_selected), pattern=r"^dist:"),
             ],
             GIR_SELECT: [
-                CallbackQueryHandler(gir_selected, pattern=r"^gir:"),
+                CallbackQueryHandler(_persisted(gir_selected), pattern=r"^gir:"),
             ],
             NEXT_PUTT: [
-                CallbackQueryHandler(next_putt_selected, pattern=r"^dist:"),
+                CallbackQueryHandler(_persisted(next_putt_selected), pattern=r"^dist:"),
             ],
         },
-        fallbacks=[CommandHandler("cancel", cancel)],
+        fallbacks=[CommandHandler("cancel", _persisted(cancel))],
     )
 
     app.add_handler(conv_handler)
@@ -0,0 +1,114 @@
+"""One bot runner across several API worker processes.
+
+Under `uvicorn --workers N` every process runs the app's lifespan, but only
+one may run the bot: a second poller would fight the first for updates and
+every worker would re-register the webhook. The workers therefore elect an
+owner with a file lock on the data volume. The owner runs the bot and
+listens on a Unix socket; the other workers serve the API and static files
+and hand any webhook update they receive to the owner over that socket.
+
+The socket speaks newline-delimited JSON: a request is [method, argument]
+and the reply is the method's result. The owner serves "put" (queue an
+update, returns false if the queue is full) and "stats" (the queue stats).
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, IO
+
+logger = logging.getLogger(__name__)
+
+
+def lock_file(path: str, wait: bool = False) -> IO | None:
+    """Take an exclusive lock on path. Returns the open file holding it, or None if taken.
+
+    The OS drops the lock when the holder exits, however it exits, so a
+    replacement worker can take over.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+class HandoffServer:
+    """The owner's end: answers requests from the other workers on a Unix socket."""
+
+    def __init__(self, path: str, methods: dict[str, Callable[[Any], Any]]):
+        self.path = path
+        self.methods = methods
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        # A socket file left by an owner that died; the lock says it's gone
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path, limit=2**20)
+
+    def close(self) -> None:
+        """Stop answering, so workers report the bot unavailable instead of queueing."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in list(self._writers):
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                method, arg = json.loads(line)
+                writer.write(json.dumps(self.methods[method](arg)).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:
+            logger.exception("Bad handoff request")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class HandoffClient:
+    """A worker's connection to the bot owner, reopened when the owner restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        self._lock = asyncio.Lock()
+
+    async def call(self, method: str, arg: Any = None) -> Any:
+        """Call a method on the owner. Raises OSError if no owner is listening."""
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = await asyncio.open_unix_connection(self.path, limit=2**20)
+                    reader, writer = self._conn
+                    writer.write(json.dumps([method, arg]).encode() + b"\n")
+                    await writer.drain()
+                    line = await reader.readline()
+                    if not line:
+                        raise ConnectionResetError("bot owner closed the connection")
+                    return json.loads(line)
+                except OSError:
+                    # A stale connection to a previous owner: retry once on a new one
+                    await self.close()
+                    if attempt:
+                        raise
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            self._conn[1].close()
+            self._conn = None
@@ -0,0 +1,116 @@
+"""Bounded queue between the webhook endpoint and the bot handlers.
+
+The webhook only validates and enqueues an update, so Telegram gets its 200
+straight away instead of waiting for DB writes and outgoing API calls. A
+fixed pool of workers processes the updates. Each chat is always handled by
+the same worker, so one player's taps are processed in order while
+different players are handled concurrently.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+from telegram import Update
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+
+def _chat_key(update: Update) -> int:
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return update.update_id
+
+
+class UpdateQueue:
+    """Per-worker bounded queues of updates, sharded by chat id."""
+
+    def __init__(self, bot_app: Application, workers: int, max_size: int):
+        self.bot_app = bot_app
+        per_worker = max(1, math.ceil(max_size / workers))
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(workers)]
+        # Enqueue times of pending updates, oldest first, mirroring each queue
+        self._pending = [deque() for _ in range(workers)]
+        self._tasks: list[asyncio.Task] = []
+        self.capacity = per_worker * workers
+        self.accepted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work(i), name=f"update-worker-{i}")
+            for i in range(len(self._queues))
+        ]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Finish queued updates (up to `drain_timeout` seconds), then stop the workers."""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(q.join() for q in self._queues)), drain_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d updates still queued", self.depth)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def put(self, update: Update) -> bool:
+        """Queue an update. Returns False if its worker's queue is full."""
+        i = _chat_key(update) % len(self._queues)
+        now = time.monotonic()
+        try:
+            self._queues[i].put_nowait((now, update))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self._pending[i].append(now)
+        self.accepted += 1
+        return True
+
+    async def _work(self, i: int) -> None:
+        queue = self._queues[i]
+        while True:
+            enqueued_at, update = await queue.get()
+            self._pending[i].popleft()
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            self.last_wait_ms = wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            try:
+                await self.bot_app.process_update(update)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                queue.task_done()
+
+    @property
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def stats(self) -> dict:
+        """Queue depth and processing lag, for monitoring."""
+        now = time.monotonic()
+        oldest = min((p[0] for p in self._pending if p), default=None)
+        return {
+            "workers": len(self._queues),
+            "depth": self.depth,
+            "capacity": self.capacity,
+            "max_worker_depth": max(q.qsize() for q in self._queues),
+            "oldest_pending_ms": round((now - oldest) * 1000, 1) if oldest is not None else 0.0,
+            "last_wait_ms": round(self.last_wait_ms, 1),
+            "max_wait_ms": round(self.max_wait_ms, 1),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
@@ -5,7 +5,27 @@ class Settings(BaseSettings):
     telegram_bot_token: str = ""
     webhook_url: str = ""
     bot_mode: str = "polling"  # "polling" or "webhook"
+    telegram_api_url: str = ""  # Bot API server; empty for Telegram's, or a local stand-in
+    webhook_secret: str = ""  # checked against X-Telegram-Bot-Api-Secret-Token if set
+    webhook_workers: int = 8  # tasks processing queued webhook updates
+    webhook_queue_size: int = 1000  # queued updates before the webhook returns 503
+    conversation_flush_seconds: float = 2.0  # how often in-progress rounds are saved
     database_url: str = "sqlite:///data/db/shortgame.db"
+    worker_dir: str = "data/db"  # lock files and bot socket shared by the app's worker processes
+    admin_token: str = ""  # enables /api/admin endpoints when set
+    stats_backend: str = "aggregate"  # "aggregate", "summary", "sql", "numpy" or "full"
+    # SQLite storage profile (file databases only)
+    sqlite_wal: bool = True
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL; "FULL" to fsync every commit
+    sqlite_cache_size_kb: int = 16384
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    db_read_pool_size: int = 4  # read-only connections for stats queries
+    db_workers: int = 4  # threads running blocking DB work for the bot
+    stats_cache_size: int = 128  # scopes with computed stats kept, at their latest data version
+    slow_stats_ms: float = 0  # log compute_stats() calls slower than this, 0 = off
+    live_poll_seconds: float = 2.0  # data version poll for live dashboards (the bot also wakes it)
+    live_heartbeat_seconds: float = 15.0  # keep-alive comment on idle live streams
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -6,6 +6,13 @@ DISTANCES = [
     "40ft", "50ft", "50ft+",
 ]
 
+# Small-integer codes stored for first putt distances: DISTANCES[code - 1].
+# NO_PUTT_CODE marks a hole without putts, UNKNOWN_DISTANCE_CODE a label
+# outside DISTANCES (the importer accepts any label).
+NO_PUTT_CODE = 0
+UNKNOWN_DISTANCE_CODE = 255
+DISTANCE_CODES: dict[str, int] = {d: i + 1 for i, d in enumerate(DISTANCES)}
+
 # Distance labels to numeric feet (midpoint estimates for averaging)
 DISTANCE_TO_FEET: dict[str, float] = {
     "Gimmie": 2.0,
@@ -25,24 +32,36 @@ DISTANCE_TO_FEET: dict[str, float] = {
     "50ft+": 60.0,
 }
 
-# PGA Tour baseline expected putts (Mark Broadie)
-SG_BASELINE: dict[str, float] = {
-    "Gimmie": 1.009,
-    "3ft": 1.053,
-    "4ft": 1.147,
-    "5ft": 1.256,
-    "6ft": 1.350,
-    "7ft": 1.443,
-    "8ft": 1.500,
-    "10ft": 1.626,
-    "15ft": 1.790,
-    "20ft": 1.878,
-    "25ft": 1.934,
-    "30ft": 1.978,
-    "40ft": 2.055,
-    "50ft": 2.135,
-    "50ft+": 2.150,
+# Strokes-gained putting baselines: expected putts to hole out by first putt
+# distance in feet, interpolated between these points (see services/baselines.py).
+# The tour curve is Mark Broadie's PGA Tour data at the DISTANCES labels; the
+# amateur curves are approximations of his handicap putting tables.
+SG_BASELINES: dict[str, dict[float, float]] = {
+    "tour": {
+        2: 1.009, 3: 1.053, 4: 1.147, 5: 1.256, 6: 1.350, 7: 1.443, 8: 1.500,
+        10: 1.626, 15: 1.790, 20: 1.878, 25: 1.934, 30: 1.978, 40: 2.055,
+        50: 2.135, 60: 2.150,
+    },
+    "scratch": {
+        2: 1.02, 3: 1.08, 4: 1.18, 5: 1.29, 6: 1.39, 7: 1.48, 8: 1.55,
+        10: 1.67, 15: 1.84, 20: 1.94, 25: 2.01, 30: 2.06, 40: 2.15,
+        50: 2.23, 60: 2.27,
+    },
+    "hcp10": {
+        2: 1.03, 3: 1.11, 4: 1.23, 5: 1.35, 6: 1.46, 7: 1.55, 8: 1.63,
+        10: 1.76, 15: 1.94, 20: 2.05, 25: 2.12, 30: 2.18, 40: 2.28,
+        50: 2.37, 60: 2.42,
+    },
+    "hcp20": {
+        2: 1.04, 3: 1.14, 4: 1.28, 5: 1.41, 6: 1.53, 7: 1.63, 8: 1.71,
+        10: 1.85, 15: 2.04, 20: 2.15, 25: 2.23, 30: 2.30, 40: 2.41,
+        50: 2.51, 60: 2.57,
+    },
 }
+DEFAULT_SG_BASELINE = "tour"
+
+# First putts with a label outside DISTANCES are scored as putts from this far
+UNKNOWN_DISTANCE_FT = 33.0
 
 # Dashboard goal thresholds
 GOALS = {
@@ -1,17 +1,30 @@
 import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
-from telegram import Update
-from telegram.ext import Application
 
 from backend.config import settings
 from backend.storage.database import init_db
-from backend.bot.handlers import build_bot_app
+from backend.bot.handoff import HandoffClient, HandoffServer, lock_file
+from backend.services.aggregates import ensure_aggregates
+from backend.services.live import live_stats
+from backend.services.metrics import WEBHOOK_UPDATES, Gauge
 from backend.api.stats import router as stats_router
+from backend.api.export import router as export_router
+from backend.api.admin import router as admin_router
+from backend.api.metrics import MetricsMiddleware, router as metrics_router
+from backend.api.frontend import FrontendFiles
+
+# The bot stack (python-telegram-bot and the handlers) is imported in
+# lifespan() only by the process that runs the bot, so dashboard-only and
+# API-only workers start without it.
+if TYPE_CHECKING:
+    from telegram.ext import Application
+    from backend.bot.update_queue import UpdateQueue
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -19,55 +32,162 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-bot_app: Application | None = None
+bot_app: "Application | None" = None
+update_queue: "UpdateQueue | None" = None
+# Set in worker processes that don't own the bot: webhook updates go to the owner
+handoff: HandoffClient | None = None
+frontend = FrontendFiles("frontend")
+
+BOT_LOCK = os.path.join(settings.worker_dir, "bot.lock")
+STARTUP_LOCK = os.path.join(settings.worker_dir, "startup.lock")
+BOT_SOCKET = os.path.join(settings.worker_dir, "bot.sock")
+
+
+def _put_update(data: dict) -> bool:
+    from telegram import Update  # loaded with the bot
+
+    return update_queue.put(Update.de_json(data, bot_app.bot))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global bot_app
-    init_db()
+    global bot_app, update_queue, handoff
+    # Workers starting together take turns at the schema and aggregate setup
+    with lock_file(STARTUP_LOCK, wait=True):
+        init_db()
+        ensure_aggregates()
     logger.info("Database initialized")
+    await live_stats.start()
+
+    bot_lock = handoff_server = None
+    if not settings.telegram_bot_token:
+        logger.warning("No TELEGRAM_BOT_TOKEN set, bot disabled")
+    elif (bot_lock := lock_file(BOT_LOCK)) is None:
+        if settings.bot_mode == "webhook":
+            handoff = HandoffClient(BOT_SOCKET)
+        logger.info(f"Bot runs in another worker; pid {os.getpid()} serves the API only")
+    else:
+        from backend.bot.conversation_store import conversation_store
+        from backend.bot.handlers import build_bot_app
+        from backend.bot.update_queue import UpdateQueue
 
-    if settings.telegram_bot_token:
         bot_app = build_bot_app()
         await bot_app.initialize()
+        await conversation_store.start()
 
         if settings.bot_mode == "webhook":
             webhook_url = f"{settings.webhook_url}/webhook"
-            await bot_app.bot.set_webhook(url=webhook_url)
+            await bot_app.bot.set_webhook(
+                url=webhook_url, secret_token=settings.webhook_secret or None
+            )
             await bot_app.start()
+            update_queue = UpdateQueue(
+                bot_app, settings.webhook_workers, settings.webhook_queue_size
+            )
+            update_queue.start()
+            handoff_server = HandoffServer(
+                BOT_SOCKET, {"put": _put_update, "stats": lambda _: update_queue.stats()}
+            )
+            await handoff_server.start()
             logger.info(f"Bot started in webhook mode: {webhook_url}")
         else:
             await bot_app.start()
             await bot_app.updater.start_polling()
             logger.info("Bot started in polling mode")
-    else:
-        logger.warning("No TELEGRAM_BOT_TOKEN set, bot disabled")
 
     yield
 
+    await live_stats.stop()
+    if handoff:
+        await handoff.close()
+        handoff = None
+    if handoff_server:
+        handoff_server.close()
+    if update_queue:
+        await update_queue.stop()
+        update_queue = None
     if bot_app:
         if settings.bot_mode == "polling" and bot_app.updater:
             await bot_app.updater.stop()
         await bot_app.stop()
+        # Save in-progress rounds once no more updates can arrive
+        await conversation_store.stop()
         await bot_app.shutdown()
+        bot_app = None
         logger.info("Bot stopped")
+    if bot_lock:
+        bot_lock.close()
 
 
 app = FastAPI(title="Shortgame Dashboard", lifespan=lifespan)
 
 app.include_router(stats_router)
+app.include_router(export_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.post("/webhook")
 async def telegram_webhook(request: Request):
-    if bot_app is None:
+    """Validate and queue an update, then return at once."""
+    if update_queue is None and handoff is None:
+        WEBHOOK_UPDATES.inc(outcome="disabled")
         return JSONResponse({"error": "Bot not configured"}, status_code=503)
-    data = await request.json()
-    update = Update.de_json(data, bot_app.bot)
-    await bot_app.process_update(update)
+    if (
+        settings.webhook_secret
+        and request.headers.get("x-telegram-bot-api-secret-token") != settings.webhook_secret
+    ):
+        WEBHOOK_UPDATES.inc(outcome="forbidden")
+        return JSONResponse({"error": "Invalid secret token"}, status_code=403)
+    try:
+        data = await request.json()
+    except ValueError:
+        WEBHOOK_UPDATES.inc(outcome="invalid")
+        return JSONResponse({"error": "Invalid JSON"}, status_code=400)
+    if not isinstance(data, dict) or not isinstance(data.get("update_id"), int):
+        WEBHOOK_UPDATES.inc(outcome="invalid")
+        return JSONResponse({"error": "Not a Telegram update"}, status_code=400)
+
+    if update_queue is not None:
+        queued = _put_update(data)
+    else:
+        try:
+            queued = await handoff.call("put", data)
+        except OSError:
+            # The bot worker is restarting; Telegram redelivers the update later
+            WEBHOOK_UPDATES.inc(outcome="unavailable")
+            return JSONResponse(
+                {"error": "Bot worker unavailable"}, status_code=503, headers={"Retry-After": "1"}
+            )
+    if not queued:
+        # Telegram redelivers the update later
+        WEBHOOK_UPDATES.inc(outcome="queue_full")
+        return JSONResponse(
+            {"error": "Update queue full"}, status_code=503, headers={"Retry-After": "1"}
+        )
+    WEBHOOK_UPDATES.inc(outcome="accepted")
     return JSONResponse({"ok": True})
 
 
+Gauge(
+    "shortgame_webhook_queue_depth",
+    "Webhook updates waiting for a worker",
+    lambda: update_queue.depth if update_queue else 0,
+)
+
+
+@app.get("/webhook/stats")
+async def webhook_stats():
+    if update_queue is not None:
+        return update_queue.stats()
+    if handoff is not None:
+        try:
+            return await handoff.call("stats")
+        except OSError:
+            pass
+    return JSONResponse({"error": "Webhook queue not running"}, status_code=503)
+
+
 # Serve frontend static files last (catch-all)
-app.mount("/", StaticFiles(directory="frontend", html=True), name="frontend")
+app.mount("/", frontend, name="frontend")
@@ -0,0 +1,197 @@
+"""Incrementally maintained stat aggregates.
+
+Every complete round adds its Tally to the "all" scope and to its player's
+scope, so reading the dashboard stats costs O(distances) regardless of how
+much history is stored. Complete rounds also get a RoundSummary row (see
+summaries.py), kept in step in the same transaction. The raw Round/Hole/Putt
+tables stay the source of truth: `rebuild_aggregates()` recomputes
+everything from them.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from backend.constants import DISTANCES
+from backend.services.summaries import delete_summary, summary_values, write_summary
+from backend.services.tally import HoleFacts, Tally, round_tally
+from backend.storage.database import (
+    DataVersion,
+    Hole,
+    Round,
+    RoundSummary,
+    StatCounter,
+    StatTotal,
+    bump_data_version,
+    get_session,
+)
+
+# Bump when the aggregate or summary columns change so that existing
+# databases are rebuilt once by ensure_aggregates()
+AGGREGATES_VERSION = 2
+
+ALL_SCOPE = "all"
+SEED_SCOPE = "user:seed"
+
+TOTAL_FIELDS = [
+    "rounds", "putts", "sg",
+    "non_gir_holes", "non_gir_one_putts",
+    "gir_approach_ft", "gir_approach_n",
+    "non_gir_approach_ft", "non_gir_approach_n",
+    "sg_unknown_holes",
+]
+COUNTER_FIELDS = ["first_attempts", "first_makes", "second_attempts", "second_makes", "sg_holes"]
+
+
+def user_scope(telegram_user_id: str) -> str:
+    return f"user:{telegram_user_id}"
+
+
+def round_scopes(round_obj: Round) -> list[str]:
+    """Scopes a round contributes to. Seed rounds are kept apart from real ones."""
+    if round_obj.is_seed:
+        return [ALL_SCOPE, SEED_SCOPE]
+    return [ALL_SCOPE, user_scope(round_obj.telegram_user_id)]
+
+
+def apply_tally(session: Session, scopes: list[str], tally: Tally, sign: int = 1) -> None:
+    """Add (or with sign=-1, remove) a tally to each scope. Caller commits."""
+    for scope in scopes:
+        total = session.get(StatTotal, scope) or StatTotal(scope=scope)
+        for name in TOTAL_FIELDS:
+            setattr(total, name, getattr(total, name) + sign * getattr(tally, name))
+        session.add(total)
+
+        for i, dist in enumerate(DISTANCES):
+            # Every 2nd putt attempt and SG hole is also a 1st putt attempt
+            if not tally.first_attempts[i]:
+                continue
+            counter = session.get(StatCounter, (scope, dist)) or StatCounter(
+                scope=scope, distance=dist
+            )
+            for name in COUNTER_FIELDS:
+                setattr(counter, name, getattr(counter, name) + sign * getattr(tally, name)[i])
+            session.add(counter)
+
+
+def read_tally(session: Session, scope: str) -> Tally:
+    """Read the aggregated tally for a scope (empty if nothing recorded)."""
+    tally = Tally()
+    total = session.get(StatTotal, scope)
+    if total is None:
+        return tally
+    for name in TOTAL_FIELDS:
+        setattr(tally, name, getattr(total, name))
+
+    index = {d: i for i, d in enumerate(DISTANCES)}
+    counters = session.exec(select(StatCounter).where(StatCounter.scope == scope)).all()
+    for c in counters:
+        i = index.get(c.distance)
+        if i is None:
+            continue
+        for name in COUNTER_FIELDS:
+            getattr(tally, name)[i] = getattr(c, name)
+    return tally
+
+
+def scope_tally(session: Session, user: str | None, include_seed: bool) -> Tally:
+    """Combine scope tallies into the tally for a user / seed selection."""
+    if user is None:
+        tally = read_tally(session, ALL_SCOPE)
+        return tally if include_seed else tally - read_tally(session, SEED_SCOPE)
+    tally = read_tally(session, user_scope(user))
+    return tally + read_tally(session, SEED_SCOPE) if include_seed else tally
+
+
+def hole_facts_query():
+    """(round_id, gir, putts_taken, first putt distance code) for every hole, in play order."""
+    return (
+        select(Hole.round_id, Hole.gir, Hole.putts_taken, Hole.first_putt_code)
+        .order_by(Hole.round_id, Hole.hole_number)
+    )
+
+
+def _load_round(session: Session, round_id: int) -> tuple[Round | None, list[HoleFacts]]:
+    round_obj = session.get(Round, round_id)
+    if round_obj is None:
+        return None, []
+    rows = session.exec(hole_facts_query().where(Hole.round_id == round_id)).all()
+    return round_obj, [(gir, putts, dist) for _, gir, putts, dist in rows]
+
+
+def record_hole_finished(session: Session, round_id: int) -> bool:
+    """Update aggregates and summary after a hole of `round_id` has been fully logged.
+
+    Only rounds with exactly 9 or 18 holes count towards the stats, so a
+    round is added when it reaches 9 holes, removed again when an 18-hole
+    round moves on to hole 10, and re-added when it reaches 18. Must run in
+    the same session (and transaction) as the write that finished the hole.
+    Returns False if the round doesn't exist.
+    """
+    round_obj, holes = _load_round(session, round_id)
+    if round_obj is None:
+        return False
+
+    scopes = round_scopes(round_obj)
+    if len(holes) in (9, 18):
+        t = round_tally(holes, round_obj.is_seed)
+        apply_tally(session, scopes, t)
+        write_summary(session, round_id, holes, round_obj.is_seed, t)
+    elif len(holes) == 10:
+        apply_tally(session, scopes, round_tally(holes[:9], round_obj.is_seed), sign=-1)
+        delete_summary(session, round_id)
+    return True
+
+
+def rebuild_aggregates() -> int:
+    """Recompute all aggregates and round summaries from the raw tables.
+
+    Also backfills summaries for databases that predate them. Returns the
+    number of complete rounds.
+    """
+    with get_session() as session:
+        rounds = {r.id: r for r in session.exec(select(Round)).all()}
+        holes_by_round: dict[int, list[HoleFacts]] = defaultdict(list)
+        for round_id, gir, putts, dist in session.exec(hole_facts_query()).all():
+            holes_by_round[round_id].append((gir, putts, dist))
+
+        by_scope: dict[str, Tally] = defaultdict(Tally)
+        summaries = []
+        for round_id, holes in holes_by_round.items():
+            round_obj = rounds.get(round_id)
+            if round_obj is None or len(holes) not in (9, 18):
+                continue
+            t = round_tally(holes, round_obj.is_seed)
+            for scope in round_scopes(round_obj):
+                by_scope[scope] += t
+            summaries.append(summary_values(round_id, holes, round_obj.is_seed, t))
+
+        session.exec(delete(RoundSummary))
+        if summaries:
+            session.exec(insert(RoundSummary), params=summaries)
+        session.exec(delete(StatCounter))
+        session.exec(delete(StatTotal))
+        for scope, t in by_scope.items():
+            apply_tally(session, [scope], t)
+        bump_data_version(session)
+        session.get(DataVersion, 1).aggregates_version = AGGREGATES_VERSION
+        session.commit()
+
+    return by_scope[ALL_SCOPE].rounds if ALL_SCOPE in by_scope else 0
+
+
+def ensure_aggregates() -> None:
+    """Build the aggregates and round summaries once for databases that predate them.
+
+    rebuild_aggregates() records AGGREGATES_VERSION in the data_version row,
+    so this rebuilds only databases that have never been rebuilt at this
+    version, e.g. ones from before the SG baseline columns (sg_unknown_holes,
+    sg_holes), which are NULL there. Entry points that write or read
+    aggregates call this after init_db().
+    """
+    with get_session() as session:
+        marker = session.get(DataVersion, 1)
+        if marker is not None and marker.aggregates_version == AGGREGATES_VERSION:
+            return
+    rebuild_aggregates()
@@ -0,0 +1,96 @@
+"""Strokes-gained putting baselines.
+
+A baseline is a curve of expected putts to hole out by first putt distance,
+given in constants.SG_BASELINES at a few distances and interpolated linearly
+between them (flat beyond either end). Each curve is sampled once, at import,
+into dense tables, so scoring a putt is a list index:
+
+- BY_INCH: by distance in whole inches, up to MAX_FEET
+- BY_CODE: by the first putt distance code stored on holes (see
+  constants.DISTANCE_CODES). Unknown labels are scored from
+  UNKNOWN_DISTANCE_FT; NO_PUTT_CODE is 0.
+
+Aggregated stats only keep SG against the default baseline. SG against
+another one is that plus, for every putted hole, the difference between the
+two baselines at its distance: OFFSET_BY_CODE holds those differences.
+"""
+
+from bisect import bisect_right
+from typing import Sequence
+
+from backend.constants import (
+    DEFAULT_SG_BASELINE,
+    DISTANCE_CODES,
+    DISTANCE_TO_FEET,
+    NO_PUTT_CODE,
+    SG_BASELINES,
+    UNKNOWN_DISTANCE_CODE,
+    UNKNOWN_DISTANCE_FT,
+)
+
+MAX_FEET = 100
+
+BASELINES = tuple(SG_BASELINES)
+
+
+def interpolate(points: dict[float, float], feet: float, xs: list[float] | None = None) -> float:
+    """Expected putts at `feet` on the piecewise-linear curve through points.
+
+    `xs` is sorted(points), for callers sampling one curve many times.
+    """
+    xs = xs or sorted(points)
+    if feet <= xs[0]:
+        return points[xs[0]]
+    if feet >= xs[-1]:
+        return points[xs[-1]]
+    i = bisect_right(xs, feet)
+    x0, x1 = xs[i - 1], xs[i]
+    return points[x0] + (points[x1] - points[x0]) * (feet - x0) / (x1 - x0)
+
+
+def _inch(feet: float) -> int:
+    return min(max(round(feet * 12), 0), MAX_FEET * 12)
+
+
+def _by_inch(points: dict[float, float]) -> list[float]:
+    xs = sorted(points)
+    return [interpolate(points, inch / 12, xs) for inch in range(MAX_FEET * 12 + 1)]
+
+
+def _by_code(by_inch: list[float]) -> list[float]:
+    table = [by_inch[_inch(UNKNOWN_DISTANCE_FT)]] * (UNKNOWN_DISTANCE_CODE + 1)
+    table[NO_PUTT_CODE] = 0.0
+    for distance, code in DISTANCE_CODES.items():
+        table[code] = by_inch[_inch(DISTANCE_TO_FEET[distance])]
+    return table
+
+
+BY_INCH = {name: _by_inch(points) for name, points in SG_BASELINES.items()}
+BY_CODE = {name: _by_code(table) for name, table in BY_INCH.items()}
+OFFSET_BY_CODE = {
+    name: [a - b for a, b in zip(table, BY_CODE[DEFAULT_SG_BASELINE])]
+    for name, table in BY_CODE.items()
+}
+
+
+def expected_putts(baseline: str, feet: float) -> float:
+    """Expected putts from `feet` on a baseline, to the nearest inch."""
+    return BY_INCH[baseline][_inch(feet)]
+
+
+def parse_baselines(value: str | Sequence[str] | None) -> tuple[str, ...]:
+    """Baseline names from a name, a comma-separated list or a sequence.
+
+    The default baseline if none are given; raises ValueError for unknown names.
+    """
+    if value is None:
+        return (DEFAULT_SG_BASELINE,)
+    if isinstance(value, str):
+        value = value.split(",")
+    names = tuple(dict.fromkeys(v.strip() for v in value if v.strip()))
+    unknown = [n for n in names if n not in SG_BASELINES]
+    if unknown:
+        raise ValueError(
+            f"Unknown SG baseline {', '.join(unknown)}; choose from {', '.join(BASELINES)}"
+        )
+    return names or (DEFAULT_SG_BASELINE,)
@@ -0,0 +1,123 @@
+"""Set-based deletion of rounds with their holes, putts and derived data.
+
+Whatever the number of rounds, a deletion is a fixed handful of statements
+in one transaction: the aggregate contribution of the complete rounds is
+read from their summaries and subtracted, then summaries, overflow putts,
+holes and rounds are removed with DELETE ... WHERE ... IN (subquery).
+"""
+
+import datetime as dt
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import and_, delete, func
+from sqlmodel import Session, select
+
+from backend.services.aggregates import ALL_SCOPE, SEED_SCOPE, apply_tally, user_scope
+from backend.services.summaries import TALLY_COLUMNS, summary_vector
+from backend.services.tally import Tally
+from backend.storage.database import (
+    Hole,
+    Putt,
+    Round,
+    RoundSummary,
+    bump_data_version,
+    get_read_session,
+    get_session,
+)
+
+
+@dataclass
+class DeleteResult:
+    rounds: int = 0
+    holes: int = 0
+    putts: int = 0
+
+
+def rounds_matching(
+    user: Optional[str] = None,
+    is_seed: Optional[bool] = None,
+    since: Optional[dt.date] = None,
+    until: Optional[dt.date] = None,
+):
+    """SQL condition on Round for a purge. At least one criterion is required."""
+    conditions = []
+    if user is not None:
+        conditions.append(Round.telegram_user_id == user)
+    if is_seed is not None:
+        conditions.append(Round.is_seed == is_seed)
+    if since is not None:
+        conditions.append(Round.date >= since)
+    if until is not None:
+        conditions.append(Round.date <= until)
+    if not conditions:
+        raise ValueError("Refusing to delete every round: give a user, seed flag or date range")
+    return and_(*conditions)
+
+
+def _remove_from_aggregates(session: Session, condition) -> None:
+    rows = session.exec(
+        select(
+            Round.telegram_user_id,
+            Round.is_seed,
+            *(getattr(RoundSummary, c) for c in TALLY_COLUMNS),
+            RoundSummary.distance_counts,
+        )
+        .join(RoundSummary, RoundSummary.round_id == Round.id)
+        .where(condition)
+    ).all()
+
+    by_scope: dict[str, list[float]] = defaultdict(lambda: Tally().as_vector())
+    for user, is_seed, *scalars, distance_counts in rows:
+        vector = summary_vector(scalars, distance_counts)
+        for scope in (ALL_SCOPE, SEED_SCOPE if is_seed else user_scope(user)):
+            by_scope[scope] = [a + b for a, b in zip(by_scope[scope], vector)]
+    for scope, vector in by_scope.items():
+        apply_tally(session, [scope], Tally.from_vector(vector), sign=-1)
+
+
+def _hole_counts(session: Session, round_ids) -> tuple[int, int]:
+    """(holes, putts) of the given rounds; each putt is one byte of Hole.putt_codes."""
+    return session.exec(
+        select(func.count(Hole.id), func.coalesce(func.sum(func.length(Hole.putt_codes)), 0))
+        .where(Hole.round_id.in_(round_ids))
+    ).one()
+
+
+def delete_rounds_where(session: Session, condition) -> DeleteResult:
+    """Delete the rounds matching `condition` and everything derived from them.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    round_ids = select(Round.id).where(condition)
+    hole_ids = select(Hole.id).where(Hole.round_id.in_(round_ids))
+
+    _remove_from_aggregates(session, condition)
+    _, putts = _hole_counts(session, round_ids)
+    session.exec(delete(RoundSummary).where(RoundSummary.round_id.in_(round_ids)))
+    session.exec(delete(Putt).where(Putt.hole_id.in_(hole_ids)))
+    holes = session.exec(delete(Hole).where(Hole.round_id.in_(round_ids))).rowcount
+    rounds = session.exec(delete(Round).where(condition)).rowcount
+    if rounds:
+        bump_data_version(session)
+    return DeleteResult(rounds=rounds, holes=holes, putts=putts)
+
+
+def purge_rounds(**criteria) -> DeleteResult:
+    """Delete the rounds selected by rounds_matching(**criteria) in one transaction."""
+    condition = rounds_matching(**criteria)
+    with get_session() as session:
+        result = delete_rounds_where(session, condition)
+        session.commit()
+    return result
+
+
+def count_rounds(**criteria) -> DeleteResult:
+    """What purge_rounds(**criteria) would delete, without deleting it."""
+    condition = rounds_matching(**criteria)
+    round_ids = select(Round.id).where(condition)
+    with get_read_session() as session:
+        rounds = session.exec(select(func.count()).select_from(Round).where(condition)).one()
+        holes, putts = _hole_counts(session, round_ids)
+    return DeleteResult(rounds=rounds, holes=holes, putts=putts)
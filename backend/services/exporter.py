@@ -0,0 +1,129 @@
+"""Streaming export of rounds with their holes and putts.
+
+Rounds are read in keyset-paginated pages (id > last id), so memory stays
+flat and the first rows go out before the whole history has been read. The
+output uses the same round layout as data/seed_data.json and can be fed
+back into the bulk importer. Every round carries an import_key (the stored
+one, or round:<id>), so rounds that look alike stay separate rounds.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import Iterator, Optional
+
+from sqlmodel import select
+
+from backend.services.importer import CSV_COLUMNS
+from backend.services.tally import unpack_putts
+from backend.storage.database import Hole, Putt, Round, get_read_session, round_filter
+
+PAGE_ROUNDS = 200
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_round_records(
+    user: Optional[str] = None,
+    include_seed: bool = True,
+    page_rounds: int = PAGE_ROUNDS,
+) -> Iterator[dict]:
+    """Yield rounds in the seed fixture layout, ordered by id."""
+    last_id = 0
+    while True:
+        with get_read_session() as session:
+            rounds = session.exec(
+                select(Round)
+                .where(round_filter(user, include_seed), Round.id > last_id)
+                .order_by(Round.id)
+                .limit(page_rounds)
+            ).all()
+            if not rounds:
+                return
+            round_ids = [r.id for r in rounds]
+            holes = session.exec(
+                select(Hole)
+                .where(Hole.round_id.in_(round_ids))
+                .order_by(Hole.round_id, Hole.hole_number)
+            ).all()
+            putts = session.exec(
+                select(Putt).join(Hole).where(Hole.round_id.in_(round_ids))
+            ).all()
+
+        # Putt only has the putts with a label outside DISTANCES
+        unknown: dict[int, dict[int, str]] = defaultdict(dict)
+        for p in putts:
+            unknown[p.hole_id][p.putt_number] = p.distance
+        holes_by_round: dict[int, list[dict]] = defaultdict(list)
+        for h in holes:
+            distances = unpack_putts(h.putt_codes, unknown.get(h.id))
+            holes_by_round[h.round_id].append({
+                "hole_number": h.hole_number,
+                "gir": h.gir,
+                "putts_taken": h.putts_taken,
+                "putts": [{"putt_number": i + 1, "distance": d} for i, d in enumerate(distances)],
+            })
+
+        for r in rounds:
+            record = {
+                # Every round needs its own key to survive a re-import: bot
+                # rounds have none stored, and two of them can share a day
+                "import_key": r.import_key or f"round:{r.id}",
+                "telegram_user_id": r.telegram_user_id,
+                "date": r.date.isoformat(),
+                "course_name": r.course_name,
+                "is_seed": r.is_seed,
+                "holes": holes_by_round[r.id],
+            }
+            yield record
+
+        last_id = rounds[-1].id
+
+
+def stream_json(records: Iterator[dict]) -> Iterator[str]:
+    yield '{"rounds": ['
+    for i, record in enumerate(records):
+        yield ("," if i else "") + "\n" + json.dumps(record)
+    yield "\n]}\n"
+
+
+def stream_ndjson(records: Iterator[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def stream_csv(records: Iterator[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, CSV_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        base = {
+            "import_key": record["import_key"],
+            "telegram_user_id": record["telegram_user_id"],
+            "date": record["date"],
+            "course_name": record["course_name"] or "",
+            "is_seed": record["is_seed"],
+        }
+        for hole in record["holes"]:
+            hole_cols = {
+                "hole_number": hole["hole_number"],
+                "gir": hole["gir"],
+                "putts_taken": hole["putts_taken"],
+            }
+            for putt in hole["putts"] or [{}]:
+                writer.writerow({**base, **hole_cols, **putt})
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+STREAMERS = {
+    "json": stream_json,
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+}
@@ -0,0 +1,386 @@
+"""Streaming bulk import of historical rounds.
+
+Rounds are read one at a time from JSON (the data/seed_data.json layout or
+a bare array), NDJSON (one round per line) or CSV (one row per putt), and
+written in large batched transactions with pre-assigned ids, so memory
+stays flat whatever the file size. Each round gets an idempotency key, and
+rounds whose key is already stored are skipped.
+"""
+
+import csv
+import datetime as dt
+import hashlib
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import groupby, islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from sqlalchemy import func, insert
+from sqlmodel import select
+
+from backend.services.aggregates import ALL_SCOPE, SEED_SCOPE, apply_tally, user_scope
+from backend.services.summaries import summary_values
+from backend.services.tally import Tally, distance_code, pack_putts, round_tally, unknown_putts
+from backend.storage.database import (
+    Hole,
+    Putt,
+    Round,
+    RoundSummary,
+    bump_data_version,
+    get_read_session,
+    get_session,
+)
+
+BATCH_ROUNDS = 1000
+
+# One row per putt; holes without putts have empty putt columns
+CSV_COLUMNS = [
+    "import_key", "telegram_user_id", "date", "course_name", "is_seed",
+    "hole_number", "gir", "putts_taken", "putt_number", "distance",
+]
+
+
+@dataclass
+class ImportResult:
+    rounds: int = 0
+    skipped: int = 0
+    holes: int = 0
+    putts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        rows = self.rounds + self.holes + self.putts
+        return rows / self.seconds if self.seconds else 0.0
+
+
+# --- Readers ---
+
+
+def iter_json_rounds(fp: IO[str], chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Yield rounds from {"rounds": [...]} or a top-level array without loading it all."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    eof = False
+
+    def more() -> bool:
+        nonlocal buf, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf += chunk
+        return bool(chunk)
+
+    # Find the opening bracket of the rounds array
+    while True:
+        stripped = buf.lstrip()
+        if stripped.startswith("["):
+            pos = len(buf) - len(stripped) + 1
+            break
+        key = buf.find('"rounds"')
+        start = buf.find("[", key) if key != -1 else -1
+        if start != -1:
+            pos = start + 1
+            break
+        if not more():
+            raise ValueError("No rounds array found")
+
+    while True:
+        # Skip separators, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or not more():
+                break
+        if pos >= len(buf):
+            raise ValueError("Unterminated rounds array")
+        if buf[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or not more():
+                raise
+            continue
+        yield item
+        buf, pos = buf[end:], 0
+
+
+def iter_ndjson_rounds(fp: IO[str]) -> Iterator[dict]:
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def iter_csv_rounds(fp: IO[str]) -> Iterator[dict]:
+    """Yield rounds from CSV rows. Rows of one round must be contiguous.
+
+    Rows sharing an import_key are one round. Rows without one start a new
+    round when the player, date or course changes, or when hole_number goes
+    back down, so two keyless rounds on the same day stay apart.
+    """
+    reader = csv.DictReader(fp)
+    rounds = 0
+    previous: tuple | None = None
+
+    def round_of(row: dict) -> int:
+        nonlocal rounds, previous
+        ident = (
+            row.get("import_key") or "",
+            row.get("telegram_user_id") or "",
+            row["date"],
+            row.get("course_name") or "",
+        )
+        hole_number = int(row["hole_number"])
+        if previous is not None:
+            last_ident, last_hole = previous
+            if ident != last_ident or (not ident[0] and hole_number < last_hole):
+                rounds += 1
+        previous = (ident, hole_number)
+        return rounds
+
+    for _, rows in groupby(reader, key=round_of):
+        rows = list(rows)
+        first = rows[0]
+        holes: list[dict] = []
+        for hole_number, hole_rows in groupby(rows, key=lambda r: int(r["hole_number"])):
+            hole_rows = list(hole_rows)
+            holes.append({
+                "hole_number": hole_number,
+                "gir": _parse_bool(hole_rows[0]["gir"]),
+                "putts_taken": int(hole_rows[0]["putts_taken"]),
+                "putts": [
+                    {"putt_number": int(r["putt_number"]), "distance": r["distance"]}
+                    for r in hole_rows
+                    if r.get("putt_number")
+                ],
+            })
+        record = {"date": first["date"], "course_name": first.get("course_name") or None, "holes": holes}
+        for key in ("import_key", "telegram_user_id"):
+            if first.get(key):
+                record[key] = first[key]
+        if first.get("is_seed"):
+            record["is_seed"] = _parse_bool(first["is_seed"])
+        yield record
+
+
+READERS = {
+    "json": iter_json_rounds,
+    "ndjson": iter_ndjson_rounds,
+    "csv": iter_csv_rounds,
+}
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if suffix == ".csv":
+        return "csv"
+    return "json"
+
+
+# --- Writer ---
+
+
+class CopyCounter:
+    """Numbers identical keyless rounds, remembering the last two batches.
+
+    A content hash seen in the current or the previous batch continues its
+    count; one not seen for a whole batch starts again at 1. Memory stays
+    bounded by the batch size whatever the file size.
+    """
+
+    def __init__(self):
+        self.current: dict[str, int] = {}
+        self.previous: dict[str, int] = {}
+
+    def next(self, digest: str) -> int:
+        n = self.current.get(digest, self.previous.get(digest, 0)) + 1
+        self.current[digest] = n
+        return n
+
+    def new_batch(self) -> None:
+        self.previous, self.current = self.current, {}
+
+
+def round_import_key(
+    record: dict, telegram_user_id: str, copies: CopyCounter | None = None
+) -> str:
+    """Idempotency key: explicit import_key, else a hash of the round's content.
+
+    Two keyless rounds can be identical and still both real. Pass `copies`
+    and the nth copy within a batch or so of the previous one gets a key of
+    its own; re-running the same file with the same batch size gives the
+    same keys.
+    """
+    if record.get("import_key"):
+        return str(record["import_key"])
+    content = json.dumps(
+        [telegram_user_id, record["date"], record.get("course_name"), record["holes"]],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha1(content.encode()).hexdigest()
+    copy = copies.next(digest) if copies is not None else 1
+    if copy > 1:
+        digest = hashlib.sha1(f"{digest}#{copy}".encode()).hexdigest()
+    return digest
+
+
+def _check_holes(record: dict) -> None:
+    counts = Counter(hole["hole_number"] for hole in record["holes"])
+    repeated = sorted(n for n, count in counts.items() if count > 1)
+    if repeated:
+        raise ValueError(
+            f"Round {record.get('import_key') or record['date']} repeats hole "
+            f"{', '.join(map(str, repeated))}"
+        )
+
+
+def _distances(hole: dict) -> list[str]:
+    """The hole's putt distances in putt order."""
+    putts = sorted(hole.get("putts") or [], key=lambda p: p["putt_number"])
+    return [p["distance"] for p in putts]
+
+
+def _import_batch(
+    records: list[dict],
+    telegram_user_id: str,
+    is_seed: bool,
+    result: ImportResult,
+    copies: CopyCounter,
+) -> None:
+    now = dt.datetime.now(dt.timezone.utc)
+    keyed: dict[str, tuple[dict, str, bool]] = {}
+    for record in records:
+        _check_holes(record)
+        user = str(record.get("telegram_user_id", telegram_user_id))
+        seed = bool(record.get("is_seed", is_seed))
+        keyed.setdefault(round_import_key(record, user, copies), (record, user, seed))
+
+    with get_read_session() as session:
+        existing = set(session.exec(
+            select(Round.import_key).where(Round.import_key.in_(list(keyed)))
+        ).all())
+    result.skipped += len(records) - len(keyed) + len(existing)
+
+    # Ids are numbered from 0 within the batch and shifted past the highest
+    # stored ones once the write lock is held
+    round_id = hole_id = putts = 0
+    round_rows, hole_rows, putt_rows, summary_rows = [], [], [], []
+    tallies: dict[str, Tally] = defaultdict(Tally)
+    for key, (record, user, seed) in keyed.items():
+        if key in existing:
+            continue
+        round_id += 1
+        round_rows.append({
+            "id": round_id,
+            "telegram_user_id": user,
+            "date": dt.date.fromisoformat(record["date"]),
+            "course_name": record.get("course_name"),
+            "is_seed": seed,
+            "import_key": key,
+            "created_at": now,
+        })
+        facts = []
+        for hole in record["holes"]:
+            hole_id += 1
+            distances = _distances(hole)
+            putts += len(distances)
+            code = distance_code(distances[0] if distances else None)
+            facts.append((hole["gir"], hole["putts_taken"], code))
+            hole_rows.append({
+                "id": hole_id,
+                "round_id": round_id,
+                "hole_number": hole["hole_number"],
+                "gir": hole["gir"],
+                "putts_taken": hole["putts_taken"],
+                "first_putt_code": code,
+                "putt_codes": pack_putts(distances),
+            })
+            putt_rows.extend(
+                {"hole_id": hole_id, "putt_number": n, "distance": d}
+                for n, d in unknown_putts(distances)
+            )
+
+        if len(facts) in (9, 18):
+            t = round_tally(facts, seed)
+            tallies[ALL_SCOPE] += t
+            tallies[SEED_SCOPE if seed else user_scope(user)] += t
+            summary_rows.append(summary_values(round_id, facts, seed, t))
+
+    if not round_rows:
+        return
+    with get_session() as session:
+        # Writing first takes the write lock, so the bot or another import
+        # can't add rows between reading the highest ids and inserting
+        bump_data_version(session)
+        round_base = session.exec(select(func.max(Round.id))).one() or 0
+        hole_base = session.exec(select(func.max(Hole.id))).one() or 0
+        for row in round_rows:
+            row["id"] += round_base
+        for row in hole_rows:
+            row["id"] += hole_base
+            row["round_id"] += round_base
+        for row in putt_rows:
+            row["hole_id"] += hole_base
+        for row in summary_rows:
+            row["round_id"] += round_base
+
+        session.exec(insert(Round), params=round_rows)
+        session.exec(insert(Hole), params=hole_rows)
+        if putt_rows:
+            session.exec(insert(Putt), params=putt_rows)
+        if summary_rows:
+            session.exec(insert(RoundSummary), params=summary_rows)
+        for scope, t in tallies.items():
+            apply_tally(session, [scope], t)
+        session.commit()
+
+    result.rounds += len(round_rows)
+    result.holes += len(hole_rows)
+    result.putts += putts
+
+
+def import_rounds(
+    records: Iterable[dict],
+    telegram_user_id: str = "",
+    is_seed: bool = False,
+    batch_rounds: int = BATCH_ROUNDS,
+    progress=None,
+) -> ImportResult:
+    """Import rounds in batches of `batch_rounds`, one transaction per batch.
+
+    `telegram_user_id` and `is_seed` apply to records that don't set them.
+    `progress`, if given, is called with the running ImportResult after each batch.
+    Raises ValueError at a round that repeats a hole number; earlier batches
+    stay imported.
+    """
+    result = ImportResult()
+    copies = CopyCounter()
+    start = time.perf_counter()
+    records = iter(records)
+    while batch := list(islice(records, batch_rounds)):
+        _import_batch(batch, telegram_user_id, is_seed, result, copies)
+        copies.new_batch()
+        result.seconds = time.perf_counter() - start
+        if progress:
+            progress(result)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def import_file(path: Path, fmt: str | None = None, **kwargs) -> ImportResult:
+    """Stream rounds from a JSON, NDJSON or CSV file into the database."""
+    reader = READERS[fmt or detect_format(path)]
+    with open(path, newline="") as fp:
+        return import_rounds(reader(fp), **kwargs)
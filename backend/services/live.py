@@ -0,0 +1,157 @@
+"""Live stats pushed to open dashboards over Server-Sent Events.
+
+One broadcaster serves every open stream. Streams subscribe to a scope (the
+/api/stats parameters); when the data version moves, each scope with
+subscribers is computed once and only the difference from its previous
+payload is queued to every subscriber, so any number of dashboards on a
+scope cost one computation per change. The bot calls notify() after it
+commits a hole; a slow poll of the data version picks up everything else
+(imports, deletions, other processes).
+
+Computations run on starlette's threadpool, like the sync stats endpoints,
+rather than on the DB executor: that is left to the bot's writes.
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import settings
+from backend.services.metrics import Gauge
+from backend.storage.database import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Per-distance tables, diffed row by row
+TABLES = ("first_putt_stats", "second_putt_stats")
+
+
+def stats_delta(old: dict, new: dict) -> dict:
+    """The keys of new whose values differ from old; tables carry only the changed rows."""
+    delta = {}
+    for key, value in new.items():
+        if key in TABLES:
+            rows = {d: row for d, row in value.items() if old.get(key, {}).get(d) != row}
+            if rows:
+                delta[key] = rows
+        elif old.get(key) != value:
+            delta[key] = value
+    return delta
+
+
+def sse_event(event: str, version: int, data: dict) -> str:
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"id: {version}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class _Scope:
+    def __init__(self, compute: Callable[[int], dict], version: int, stats: dict):
+        self.compute = compute
+        self.version = version
+        self.stats = stats
+        self.queues: set[asyncio.Queue] = set()
+
+
+class LiveStats:
+    def __init__(self, poll_seconds: float, heartbeat_seconds: float, queue_size: int = 16):
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.queue_size = queue_size
+        self._scopes: dict[Hashable, _Scope] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def streams(self) -> int:
+        return sum(len(scope.queues) for scope in self._scopes.values())
+
+    def notify(self) -> None:
+        """Check for new data now rather than at the next poll."""
+        self._wake.set()
+
+    async def stream(self, key: Hashable, compute: Callable[[int], dict]) -> AsyncIterator[str]:
+        """SSE text for one dashboard: a full "stats" event, then "delta" events.
+
+        compute(version) returns the stats payload for the scope and runs in
+        the threadpool.
+        """
+        scope = self._scopes.get(key)
+        if scope is None:
+            version = await run_in_threadpool(get_data_version)
+            stats = await run_in_threadpool(compute, version)
+            # Another stream may have added the scope while this one computed
+            scope = self._scopes.setdefault(key, _Scope(compute, version, stats))
+
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        scope.queues.add(queue)
+        try:
+            yield sse_event("stats", scope.version, scope.stats)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    # Fell behind: resend everything instead of the dropped deltas
+                    message = sse_event("stats", scope.version, scope.stats)
+                yield message
+        finally:
+            scope.queues.discard(queue)
+            if not scope.queues and self._scopes.get(key) is scope:
+                del self._scopes[key]
+
+    async def publish(self) -> int:
+        """Send each scope's changes since the last publish. Returns scopes with changes."""
+        version = await run_in_threadpool(get_data_version)
+        changed = 0
+        for scope in list(self._scopes.values()):
+            if scope.version >= version:
+                continue
+            stats = await run_in_threadpool(scope.compute, version)
+            delta = stats_delta(scope.stats, stats)
+            scope.version, scope.stats = version, stats
+            if not delta:
+                continue
+            changed += 1
+            message = sse_event("delta", version, delta)
+            for queue in scope.queues:
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+        return changed
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="live-stats")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._scopes:
+                continue
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception("Failed to publish live stats, will retry")
+
+
+live_stats = LiveStats(settings.live_poll_seconds, settings.live_heartbeat_seconds)
+
+Gauge("shortgame_live_streams", "Open live dashboard streams", lambda: live_stats.streams)
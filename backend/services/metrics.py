@@ -0,0 +1,221 @@
+"""In-process counters and histograms exported in the Prometheus text format.
+
+Metrics are module-level objects registered on creation; `render()` produces
+the /metrics payload. Label values are passed as keyword arguments and every
+combination seen becomes its own series, so only use labels with a small,
+fixed set of values (backend, handler, route template, ...).
+
+A Trace collects what happened during one unit of work (an HTTP request, a
+bot update, a stats call): time per phase and the DB queries it ran. Traces
+nest, and a query or phase is added to every trace open in the current
+context, so a request sees the queries of the stats call it made.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# Seconds, from sub-millisecond aggregate reads to multi-second full scans
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs: tuple[tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _key(labels: dict) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value read from `fn` each time the metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float]):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_format_value(self.fn())}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+        # key -> [count per bucket (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for key, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels((*key, ("le", _format_value(bound))))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# --- Traces ---
+
+
+class Trace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def breakdown(self) -> str:
+        """Phases and DB time in milliseconds, for log lines."""
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items()]
+        parts.append(f"db={self.db_seconds * 1000:.1f}ms/{self.queries}q")
+        return " ".join(parts)
+
+
+_traces: ContextVar[tuple[Trace, ...]] = ContextVar("traces", default=())
+
+
+@contextmanager
+def traced() -> Iterator[Trace]:
+    """Open a Trace for the work done inside the block."""
+    trace = Trace()
+    token = _traces.set((*_traces.get(), trace))
+    try:
+        yield trace
+    finally:
+        _traces.reset(token)
+
+
+def record_query(seconds: float) -> None:
+    for trace in _traces.get():
+        trace.queries += 1
+        trace.db_seconds += seconds
+
+
+class PhaseTimer:
+    """Time consecutive phases of a function into a histogram and the open traces.
+
+    Each mark(name) closes the phase that ran since the previous mark.
+    """
+
+    def __init__(self, histogram: Histogram, **labels):
+        self.histogram = histogram
+        self.labels = labels
+        self._last = time.perf_counter()
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        seconds = now - self._last
+        self._last = now
+        self.histogram.observe(seconds, phase=name, **self.labels)
+        for trace in _traces.get():
+            trace.phases[name] = trace.phases.get(name, 0.0) + seconds
+
+
+# --- Metrics ---
+
+DB_QUERY_SECONDS = Histogram(
+    "shortgame_db_query_seconds", "Duration of SQL statements by connection pool"
+)
+HTTP_REQUESTS = Counter("shortgame_http_requests_total", "HTTP requests by route and status")
+HTTP_REQUEST_SECONDS = Histogram("shortgame_http_request_seconds", "HTTP request duration by route")
+HTTP_REQUEST_QUERIES = Histogram(
+    "shortgame_http_request_db_queries", "SQL statements per HTTP request", COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "shortgame_http_request_db_seconds", "Time in SQL statements per HTTP request"
+)
+STATS_SECONDS = Histogram("shortgame_stats_seconds", "compute_stats() duration by backend")
+STATS_PHASE_SECONDS = Histogram(
+    "shortgame_stats_phase_seconds", "compute_stats() duration by backend and phase"
+)
+SLOW_STATS = Counter("shortgame_stats_slow_total", "compute_stats() calls over the slow threshold")
+BOT_HANDLER_SECONDS = Histogram("shortgame_bot_handler_seconds", "Bot handler duration")
+BOT_HANDLER_QUERIES = Histogram(
+    "shortgame_bot_handler_db_queries", "SQL statements per bot handler call", COUNT_BUCKETS
+)
+BOT_HANDLER_ERRORS = Counter("shortgame_bot_handler_errors_total", "Bot handler exceptions")
+WEBHOOK_UPDATES = Counter("shortgame_webhook_updates_total", "Webhook deliveries by outcome")
@@ -0,0 +1,75 @@
+"""Versioned LRU cache for computed stats with single-flight recomputation."""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+from backend.config import settings
+
+
+class StatsCache:
+    """LRU cache keyed by (*scope, data version) tuples.
+
+    Only the newest version of each scope is kept: storing a newer one
+    drops the older entry, and results computed for an older version than
+    the cached one are returned without being stored.
+
+    Concurrent misses for the same key share one computation: the first
+    caller computes while the others wait on its result.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._versions: dict[tuple, Hashable] = {}
+        self._inflight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key: tuple, value: Any) -> None:
+        scope, version = key[:-1], key[-1]
+        cached = self._versions.get(scope)
+        if cached is not None and cached > version:
+            return
+        if cached is not None:
+            self._entries.pop((*scope, cached), None)
+        self._versions[scope] = version
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            (*evicted, _), _ = self._entries.popitem(last=False)
+            del self._versions[tuple(evicted)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+stats_cache = StatsCache(settings.stats_cache_size)
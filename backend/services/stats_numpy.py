@@ -0,0 +1,118 @@
+"""Columnar NumPy stats backend.
+
+Loads every hole in scope once into compact arrays (round, seed flag, GIR,
+putts taken, first putt distance code) and computes the Tally with array
+operations instead of per-object Python loops. Distance codes are the ones
+stored on Hole (see constants.DISTANCE_CODES), with unknown labels folded
+into UNKNOWN_INDEX so lookup tables stay small.
+"""
+
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlmodel import Session
+
+from backend.constants import DISTANCES, DISTANCE_TO_FEET, NO_PUTT_CODE
+from backend.services.tally import SG_BY_CODE, Tally
+from backend.storage.database import Hole, Round, round_filter
+
+UNKNOWN_INDEX = len(DISTANCES) + 1
+
+# Indexed by distance code; NO_PUTT_CODE (0) is never looked up
+SG_LOOKUP = np.array(SG_BY_CODE[:UNKNOWN_INDEX + 1])
+FEET_LOOKUP = np.array([0.0] + [DISTANCE_TO_FEET[d] for d in DISTANCES] + [0.0])
+
+
+def load_hole_arrays(
+    session: Session, user: Optional[str] = None, include_seed: bool = True
+) -> dict[str, np.ndarray]:
+    """Load per-hole columns for the rounds in scope."""
+    query = (
+        select(Hole.round_id, Round.is_seed, Hole.gir, Hole.putts_taken, Hole.first_putt_code)
+        .join(Round, Round.id == Hole.round_id)
+        .where(round_filter(user, include_seed))
+    )
+
+    # Every column is an integer, so skip SQLAlchemy's per-row result
+    # processing and feed the raw DB-API tuples straight into one array.
+    compiled = query.compile(dialect=session.get_bind().dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = session.connection().exec_driver_sql(str(compiled), params).fetchall()
+    table = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5)
+    table = table.reshape(-1, 5)
+    return {
+        "round_id": table[:, 0],
+        "is_seed": table[:, 1].astype(bool),
+        "gir": table[:, 2].astype(bool),
+        "putts": table[:, 3].astype(np.int8),
+        "dist": np.minimum(table[:, 4], UNKNOWN_INDEX).astype(np.int8),
+    }
+
+
+def tally_from_arrays(cols: dict[str, np.ndarray]) -> Tally:
+    """Compute the stats tally from per-hole column arrays."""
+    t = Tally()
+    if not len(cols["round_id"]):
+        return t
+
+    # Dense round index per hole, then keep complete (9 or 18 hole) rounds only
+    _, round_idx = np.unique(cols["round_id"], return_inverse=True)
+    hole_count = np.bincount(round_idx)
+    complete = np.isin(hole_count, (9, 18))
+    keep = complete[round_idx]
+    if not keep.any():
+        return t
+
+    round_idx = round_idx[keep]
+    is_seed = cols["is_seed"][keep]
+    gir = cols["gir"][keep]
+    putts = cols["putts"][keep].astype(np.int64)
+    dist = cols["dist"][keep].astype(np.int64)
+    n_rounds = len(hole_count)
+
+    # --- Per-round putts and SG, normalized to 18 holes ---
+    round_factor = np.where(hole_count == 9, 2, 1)
+    factor = round_factor[complete]
+    hole_factor = round_factor[round_idx]
+    has_putt = dist != NO_PUTT_CODE
+    sg_hole = np.where(has_putt, SG_LOOKUP[dist] - putts, 0.0)
+    round_putts = np.bincount(round_idx, weights=putts, minlength=n_rounds)[complete]
+    round_sg = np.bincount(round_idx, weights=sg_hole, minlength=n_rounds)[complete]
+
+    t.rounds = int(complete.sum())
+    t.putts = int(round(float((round_putts * factor).sum())))
+    t.sg = float((round_sg * factor).sum())
+
+    # --- Up & Down ---
+    non_gir = ~gir
+    t.non_gir_holes = int(non_gir.sum())
+    t.non_gir_one_putts = int((non_gir & (putts == 1)).sum())
+
+    # --- Approach distances (real rounds, known distances only) ---
+    known = has_putt & (dist != UNKNOWN_INDEX)
+    feet = FEET_LOOKUP[dist]
+    real = known & ~is_seed
+    t.gir_approach_ft = float(feet[real & gir].sum())
+    t.gir_approach_n = int((real & gir).sum())
+    t.non_gir_approach_ft = float(feet[real & non_gir].sum())
+    t.non_gir_approach_n = int((real & non_gir).sum())
+
+    # --- Make % by first putt distance ---
+    d = dist[known] - 1
+    p = putts[known]
+    size = len(DISTANCES)
+    t.first_attempts = np.bincount(d, minlength=size).tolist()
+    t.first_makes = np.bincount(d[p == 1], minlength=size).tolist()
+    t.second_attempts = np.bincount(d[p >= 2], minlength=size).tolist()
+    t.second_makes = np.bincount(d[p == 2], minlength=size).tolist()
+    t.sg_holes = np.bincount(d, weights=hole_factor[known], minlength=size).astype(np.int64).tolist()
+    t.sg_unknown_holes = int(hole_factor[has_putt & (dist == UNKNOWN_INDEX)].sum())
+    return t
+
+
+def compute_tally_numpy(
+    session: Session, user: Optional[str] = None, include_seed: bool = True
+) -> Tally:
+    return tally_from_arrays(load_hole_arrays(session, user, include_seed))
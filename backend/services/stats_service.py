@@ -1,9 +1,26 @@
+import logging
 from collections import defaultdict
+from typing import Sequence
 
 from sqlmodel import select
 
-from backend.constants import DISTANCES, DISTANCE_TO_FEET, GOALS, SG_BASELINE
-from backend.storage.database import Hole, Putt, Round, get_session
+from backend.config import settings
+from backend.constants import (
+    DEFAULT_SG_BASELINE,
+    DISTANCES,
+    DISTANCE_TO_FEET,
+    GOALS,
+    UNKNOWN_DISTANCE_FT,
+)
+from backend.services.aggregates import scope_tally
+from backend.services.baselines import BASELINES, expected_putts, parse_baselines
+from backend.services.metrics import SLOW_STATS, STATS_PHASE_SECONDS, STATS_SECONDS, PhaseTimer, traced
+from backend.services.stats_sql import compute_tally_sql
+from backend.services.summaries import compute_tally_summary
+from backend.services.tally import Tally, unpack_putts
+from backend.storage.database import Hole, Putt, Round, get_read_session, round_filter
+
+logger = logging.getLogger(__name__)
 
 
 def _feet_to_display(feet: float) -> str:
@@ -16,17 +33,144 @@ def _feet_to_display(feet: float) -> str:
     return f"{ft}'{inches}\""
 
 
-def compute_stats() -> dict:
-    """Compute all dashboard statistics from the database."""
-    with get_session() as session:
-        rounds = session.exec(select(Round)).all()
+def compute_stats(
+    user: str | None = None,
+    include_seed: bool = True,
+    baseline: str | Sequence[str] = DEFAULT_SG_BASELINE,
+) -> dict:
+    """Compute all dashboard statistics using the configured backend.
+
+    `user` limits the stats to one Telegram user's real rounds; seed rounds
+    are blended in unless `include_seed` is False. `baseline` is one or more
+    SG baselines (see parse_baselines); `sg_putting` is against the first.
+    Calls slower than `slow_stats_ms` are logged with their phase breakdown.
+    """
+    backend = settings.stats_backend
+    baselines = parse_baselines(baseline)
+    with traced() as trace:
+        stats = _compute_stats(backend, user, include_seed, baselines)
+    elapsed = trace.elapsed
+    STATS_SECONDS.observe(elapsed, backend=backend)
+    if settings.slow_stats_ms and elapsed * 1000 >= settings.slow_stats_ms:
+        SLOW_STATS.inc(backend=backend)
+        logger.warning(
+            "Slow stats call: %.1fms backend=%s user=%s include_seed=%s %s",
+            elapsed * 1000, backend, user, include_seed, trace.breakdown(),
+        )
+    return stats
+
+
+def _compute_stats(backend: str, user: str | None, include_seed: bool, baselines: tuple[str, ...]) -> dict:
+    if backend == "full":
+        return compute_stats_full(user, include_seed, baselines)
+    phases = PhaseTimer(STATS_PHASE_SECONDS, backend=backend)
+    with get_read_session() as session:
+        if backend == "sql":
+            tally = compute_tally_sql(session, user, include_seed)
+        elif backend == "summary":
+            tally = compute_tally_summary(session, user, include_seed)
+        elif backend == "numpy":
+            # Imported lazily so numpy is only loaded when this backend is used
+            from backend.services.stats_numpy import compute_tally_numpy
+            tally = compute_tally_numpy(session, user, include_seed)
+        else:
+            tally = scope_tally(session, user, include_seed)
+    phases.mark("load")
+    stats = stats_from_tally(tally, baselines)
+    phases.mark("build")
+    return stats
+
+
+def _sg_stats(sg_putting: dict[str, float]) -> dict:
+    """Payload fields for SG per round against each requested baseline, the first leading."""
+    by_baseline = {name: round(sg, 2) for name, sg in sg_putting.items()}
+    first = next(iter(by_baseline))
+    return {
+        "sg_putting": by_baseline[first],
+        "sg_baseline": first,
+        "sg_putting_by_baseline": by_baseline,
+    }
+
+
+def stats_from_tally(t: Tally, baselines: Sequence[str] = (DEFAULT_SG_BASELINE,)) -> dict:
+    """Build the dashboard stats payload from aggregated running sums.
+
+    SG against every baseline comes from the same tally, so asking for more
+    of them costs a few multiplications each.
+    """
+    if not t.rounds:
+        return _empty_stats(baselines)
+
+    putts_per_round = t.putts / t.rounds
+    sg_putting = {name: t.sg_against(name) / t.rounds for name in baselines}
+    up_and_down_pct = (t.non_gir_one_putts / t.non_gir_holes * 100) if t.non_gir_holes else 0
+    non_gir_approach_avg = (
+        t.non_gir_approach_ft / t.non_gir_approach_n if t.non_gir_approach_n else 0
+    )
+    gir_approach_avg = t.gir_approach_ft / t.gir_approach_n if t.gir_approach_n else 0
+
+    def _dist_stats(attempts: int, makes: int) -> dict:
+        if not attempts:
+            return {"attempts": 0, "makes": 0, "pct": 0}
+        return {"attempts": attempts, "makes": makes, "pct": round(makes / attempts * 100, 1)}
+
+    first_putt_stats = {
+        d: _dist_stats(t.first_attempts[i], t.first_makes[i]) for i, d in enumerate(DISTANCES)
+    }
+    second_putt_stats = {
+        d: _dist_stats(t.second_attempts[i], t.second_makes[i]) for i, d in enumerate(DISTANCES)
+    }
+
+    def _bucket_make_pct(distances: list[str]) -> float:
+        total_attempts = sum(first_putt_stats[d]["attempts"] for d in distances)
+        total_makes = sum(first_putt_stats[d]["makes"] for d in distances)
+        return round(total_makes / total_attempts * 100, 1) if total_attempts else 0
+
+    return {
+        "total_rounds": t.rounds,
+        "putts_per_round": round(putts_per_round, 1),
+        "up_and_down_pct": round(up_and_down_pct, 1),
+        "non_gir_approach_ft": round(non_gir_approach_avg, 2),
+        "non_gir_approach_display": _feet_to_display(non_gir_approach_avg) if t.non_gir_approach_n else "--",
+        "gir_approach_ft": round(gir_approach_avg, 2),
+        "gir_approach_display": _feet_to_display(gir_approach_avg) if t.gir_approach_n else "--",
+        **_sg_stats(sg_putting),
+        "make_pct_3ft": _bucket_make_pct(["3ft"]),
+        "make_pct_4_5ft": _bucket_make_pct(["4ft", "5ft"]),
+        "make_pct_6_7ft": _bucket_make_pct(["6ft", "7ft"]),
+        "first_putt_stats": first_putt_stats,
+        "second_putt_stats": second_putt_stats,
+        "goals": GOALS,
+    }
+
+
+def check_aggregates(user: str | None = None, include_seed: bool = True) -> list[str]:
+    """Compare the aggregate store against a full scan, on every baseline. Returns mismatched keys."""
+    expected = compute_stats_full(user, include_seed, BASELINES)
+    with get_read_session() as session:
+        actual = stats_from_tally(scope_tally(session, user, include_seed), BASELINES)
+    return [k for k in expected if expected[k] != actual.get(k)]
+
+
+def compute_stats_full(
+    user: str | None = None,
+    include_seed: bool = True,
+    baselines: Sequence[str] = (DEFAULT_SG_BASELINE,),
+) -> dict:
+    """Compute all dashboard statistics by scanning every round, hole and putt.
+
+    This is the reference implementation the faster backends are checked against.
+    """
+    phases = PhaseTimer(STATS_PHASE_SECONDS, backend="full")
+    scope = round_filter(user, include_seed)
+    with get_read_session() as session:
+        rounds = session.exec(select(Round).where(scope)).all()
         if not rounds:
-            return _empty_stats()
+            return _empty_stats(baselines)
 
-        round_ids = [r.id for r in rounds]
-        holes = session.exec(select(Hole).where(Hole.round_id.in_(round_ids))).all()
-        hole_ids = [h.id for h in holes]
-        putts = session.exec(select(Putt).where(Putt.hole_id.in_(hole_ids))).all()
+        holes = session.exec(select(Hole).join(Round).where(scope)).all()
+        putts = session.exec(select(Putt).join(Hole).join(Round).where(scope)).all()
+    phases.mark("load")
 
     # Build lookup structures
     holes_by_round: dict[int, list[Hole]] = defaultdict(list)
@@ -36,17 +180,18 @@ def compute_stats() -> dict:
     # Filter to complete rounds only (9 or 18 holes)
     rounds = [r for r in rounds if len(holes_by_round[r.id]) in (9, 18)]
     if not rounds:
-        return _empty_stats()
+        return _empty_stats(baselines)
 
     # Rebuild hole list from complete rounds only
     complete_round_ids = {r.id for r in rounds}
     holes = [h for h in holes if h.round_id in complete_round_ids]
-    hole_ids = [h.id for h in holes]
 
-    putts_by_hole: dict[int, list[Putt]] = defaultdict(list)
+    # Putt only has the putts with a label outside DISTANCES
+    unknown: dict[int, dict[int, str]] = defaultdict(dict)
     for p in putts:
-        if p.hole_id in set(hole_ids):
-            putts_by_hole[p.hole_id].append(p)
+        unknown[p.hole_id][p.putt_number] = p.distance
+    putts_by_hole = {h.id: unpack_putts(h.putt_codes, unknown.get(h.id)) for h in holes}
+    phases.mark("filter")
 
     # --- Putts Per Round (normalized to 18 holes) ---
     round_putt_counts = []
@@ -58,11 +203,13 @@ def compute_stats() -> dict:
             total *= 2
         round_putt_counts.append(total)
     putts_per_round = sum(round_putt_counts) / len(round_putt_counts) if round_putt_counts else 0
+    phases.mark("putts_per_round")
 
     # --- Up & Down % (1-putt rate on non-GIR holes) ---
     non_gir_holes = [h for h in holes if not h.gir]
     non_gir_one_putts = sum(1 for h in non_gir_holes if h.putts_taken == 1)
     up_and_down_pct = (non_gir_one_putts / len(non_gir_holes) * 100) if non_gir_holes else 0
+    phases.mark("up_and_down")
 
     # --- Approach Distances (real rounds only, excludes seed data) ---
     real_round_ids = {r.id for r in rounds if not r.is_seed}
@@ -71,9 +218,9 @@ def compute_stats() -> dict:
     real_non_gir_holes = [h for h in real_holes if not h.gir]
     non_gir_approach_distances = []
     for h in real_non_gir_holes:
-        hole_putts = sorted(putts_by_hole[h.id], key=lambda p: p.putt_number)
+        hole_putts = putts_by_hole[h.id]
         if hole_putts:
-            first_dist = hole_putts[0].distance
+            first_dist = hole_putts[0]
             if first_dist in DISTANCE_TO_FEET:
                 non_gir_approach_distances.append(DISTANCE_TO_FEET[first_dist])
     non_gir_approach_avg = (
@@ -85,9 +232,9 @@ def compute_stats() -> dict:
     real_gir_holes = [h for h in real_holes if h.gir]
     gir_approach_distances = []
     for h in real_gir_holes:
-        hole_putts = sorted(putts_by_hole[h.id], key=lambda p: p.putt_number)
+        hole_putts = putts_by_hole[h.id]
         if hole_putts:
-            first_dist = hole_putts[0].distance
+            first_dist = hole_putts[0]
             if first_dist in DISTANCE_TO_FEET:
                 gir_approach_distances.append(DISTANCE_TO_FEET[first_dist])
     gir_approach_avg = (
@@ -95,24 +242,26 @@ def compute_stats() -> dict:
         if gir_approach_distances
         else 0
     )
+    phases.mark("approach")
 
-    # --- SG:Putting (normalized to 18 holes) ---
-    sg_per_round = []
+    # --- SG:Putting against each baseline (normalized to 18 holes) ---
+    sg_totals = dict.fromkeys(baselines, 0.0)
     for r in rounds:
         hole_count = len(holes_by_round[r.id])
-        sg_round = 0.0
+        sg_round = dict.fromkeys(baselines, 0.0)
         for h in holes_by_round[r.id]:
-            hole_putts = sorted(putts_by_hole[h.id], key=lambda p: p.putt_number)
+            hole_putts = putts_by_hole[h.id]
             if hole_putts:
-                first_dist = hole_putts[0].distance
-                expected = SG_BASELINE.get(first_dist, 2.0)
+                feet = DISTANCE_TO_FEET.get(hole_putts[0], UNKNOWN_DISTANCE_FT)
                 actual = h.putts_taken
-                sg_round += expected - actual
+                for name in baselines:
+                    sg_round[name] += expected_putts(name, feet) - actual
         # Normalize 9-hole rounds to 18-hole equivalent
-        if hole_count == 9:
-            sg_round *= 2
-        sg_per_round.append(sg_round)
-    sg_putting = sum(sg_per_round) / len(sg_per_round) if sg_per_round else 0
+        factor = 2 if hole_count == 9 else 1
+        for name in baselines:
+            sg_totals[name] += sg_round[name] * factor
+    sg_putting = {name: total / len(rounds) for name, total in sg_totals.items()}
+    phases.mark("sg")
 
     # --- Make % by distance (1st putt and 2nd putt) ---
     first_putt_stats: dict[str, dict] = {}
@@ -123,11 +272,11 @@ def compute_stats() -> dict:
     second_putt_by_dist: dict[str, list[bool]] = defaultdict(list)
 
     for h in holes:
-        hole_putts = sorted(putts_by_hole[h.id], key=lambda p: p.putt_number)
+        hole_putts = putts_by_hole[h.id]
         if not hole_putts:
             continue
 
-        first_dist = hole_putts[0].distance
+        first_dist = hole_putts[0]
 
         # 1st putt: made if total putts == 1
         first_putt_by_dist[first_dist].append(h.putts_taken == 1)
@@ -171,6 +320,7 @@ def compute_stats() -> dict:
     make_pct_3ft = _bucket_make_pct(["3ft"])
     make_pct_4_5ft = _bucket_make_pct(["4ft", "5ft"])
     make_pct_6_7ft = _bucket_make_pct(["6ft", "7ft"])
+    phases.mark("make_pct")
 
     return {
         "total_rounds": len(rounds),
@@ -180,7 +330,7 @@ def compute_stats() -> dict:
         "non_gir_approach_display": _feet_to_display(non_gir_approach_avg) if non_gir_approach_distances else "--",
         "gir_approach_ft": round(gir_approach_avg, 2),
         "gir_approach_display": _feet_to_display(gir_approach_avg) if gir_approach_distances else "--",
-        "sg_putting": round(sg_putting, 2),
+        **_sg_stats(sg_putting),
         "make_pct_3ft": make_pct_3ft,
         "make_pct_4_5ft": make_pct_4_5ft,
         "make_pct_6_7ft": make_pct_6_7ft,
@@ -190,7 +340,7 @@ def compute_stats() -> dict:
     }
 
 
-def _empty_stats() -> dict:
+def _empty_stats(baselines: Sequence[str] = (DEFAULT_SG_BASELINE,)) -> dict:
     """Return empty stats structure when no data exists."""
     empty_dist = {d: {"attempts": 0, "makes": 0, "pct": 0} for d in DISTANCES}
     return {
@@ -201,7 +351,7 @@ def _empty_stats() -> dict:
         "non_gir_approach_display": "--",
         "gir_approach_ft": 0,
         "gir_approach_display": "--",
-        "sg_putting": 0,
+        **_sg_stats(dict.fromkeys(baselines, 0)),
         "make_pct_3ft": 0,
         "make_pct_4_5ft": 0,
         "make_pct_6_7ft": 0,
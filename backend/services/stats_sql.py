@@ -0,0 +1,110 @@
+"""SQL push-down stats backend.
+
+Computes the same Tally as the Python full scan with two aggregate queries,
+so SQLite does the per-hole work and only a few dozen grouped rows come back.
+"""
+
+from typing import Optional
+
+from sqlalchemy import case, func, literal, select
+from sqlmodel import Session
+
+from backend.constants import DISTANCE_CODES, NO_PUTT_CODE, UNKNOWN_DISTANCE_CODE
+from backend.services.tally import FEET_BY_CODE, SG_BY_CODE, Tally
+from backend.storage.database import Hole, Round, round_filter
+
+
+def _complete_hole_facts(user: Optional[str], include_seed: bool):
+    """Subquery of per-hole facts for holes in complete (9 or 18 hole) rounds."""
+    facts = (
+        select(
+            Hole.round_id,
+            Round.is_seed,
+            Hole.gir,
+            Hole.putts_taken,
+            Hole.first_putt_code.label("code"),
+            func.count().over(partition_by=Hole.round_id).label("hole_count"),
+        )
+        .join(Round, Round.id == Hole.round_id)
+        .where(round_filter(user, include_seed))
+        .subquery()
+    )
+    return select(facts).where(facts.c.hole_count.in_((9, 18))).subquery()
+
+
+def compute_tally_sql(session: Session, user: Optional[str] = None, include_seed: bool = True) -> Tally:
+    """Compute the stats tally with GROUP BY / window queries in the database."""
+    facts = _complete_hole_facts(user, include_seed)
+    t = Tally()
+
+    # --- Per-round putts and SG, normalized to 18 holes ---
+    expected = case(
+        {code: SG_BY_CODE[code] for code in DISTANCE_CODES.values()},
+        value=facts.c.code,
+        else_=SG_BY_CODE[UNKNOWN_DISTANCE_CODE],
+    )
+    sg = case(
+        (facts.c.code == NO_PUTT_CODE, literal(0.0)),
+        else_=expected - facts.c.putts_taken,
+    )
+    per_round = (
+        select(
+            case((facts.c.hole_count == 9, 2), else_=1).label("factor"),
+            func.sum(facts.c.putts_taken).label("putts"),
+            func.sum(sg).label("sg"),
+        )
+        .group_by(facts.c.round_id, facts.c.hole_count)
+        .subquery()
+    )
+    rounds, putts, sg_total = session.execute(
+        select(
+            func.count(),
+            func.sum(per_round.c.putts * per_round.c.factor),
+            func.sum(per_round.c.sg * per_round.c.factor),
+        )
+    ).one()
+    if not rounds:
+        return t
+    t.rounds, t.putts, t.sg = rounds, putts, sg_total
+
+    # --- Hole outcomes grouped by GIR, seed flag and first putt distance ---
+    rows = session.execute(
+        select(
+            facts.c.gir,
+            facts.c.is_seed,
+            facts.c.code,
+            func.count(),
+            func.sum(case((facts.c.putts_taken == 1, 1), else_=0)),
+            func.sum(case((facts.c.putts_taken >= 2, 1), else_=0)),
+            func.sum(case((facts.c.putts_taken == 2, 1), else_=0)),
+            func.sum(case((facts.c.hole_count == 9, 2), else_=1)),
+        ).group_by(facts.c.gir, facts.c.is_seed, facts.c.code)
+    ).all()
+
+    for gir, is_seed, code, n, one_putts, multi_putts, two_putts, normalized in rows:
+        if not gir:
+            t.non_gir_holes += n
+            t.non_gir_one_putts += one_putts
+        if code == NO_PUTT_CODE:
+            continue
+
+        feet = FEET_BY_CODE.get(code)
+        if not is_seed and feet is not None:
+            if gir:
+                t.gir_approach_ft += feet * n
+                t.gir_approach_n += n
+            else:
+                t.non_gir_approach_ft += feet * n
+                t.non_gir_approach_n += n
+
+        if code == UNKNOWN_DISTANCE_CODE:
+            t.sg_unknown_holes += normalized
+            continue
+        idx = code - 1
+        t.sg_holes[idx] += normalized
+        t.first_attempts[idx] += n
+        t.first_makes[idx] += one_putts
+        t.second_attempts[idx] += multi_putts
+        t.second_makes[idx] += two_putts
+
+    return t
@@ -0,0 +1,131 @@
+"""Per-round summary rows.
+
+A round gets a RoundSummary row when it becomes complete and loses it when
+it stops being complete (an 18-hole round moving on to hole 10), so the rows
+are exactly the rounds that count towards the stats. Reading them replaces
+joining Hole and Putt and counting holes per round.
+"""
+
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, func, true
+from sqlmodel import Session, select
+
+from backend.constants import DISTANCES
+from backend.services.tally import DISTANCE_INDEX, HoleFacts, Tally, round_tally
+from backend.storage.database import Round, RoundSummary, round_filter
+
+# RoundSummary column -> Tally field, for the scalar running sums (in Tally field order)
+TALLY_COLUMNS = {
+    "normalized_putts": "putts",
+    "sg": "sg",
+    "up_down_attempts": "non_gir_holes",
+    "up_down_makes": "non_gir_one_putts",
+    "gir_approach_ft": "gir_approach_ft",
+    "gir_approach_n": "gir_approach_n",
+    "non_gir_approach_ft": "non_gir_approach_ft",
+    "non_gir_approach_n": "non_gir_approach_n",
+    "sg_unknown_holes": "sg_unknown_holes",
+}
+COUNT_FIELDS = ["first_attempts", "first_makes", "second_attempts", "second_makes", "sg_holes"]
+
+
+def summary_values(
+    round_id: int, holes: list[HoleFacts], is_seed: bool, tally: Optional[Tally] = None
+) -> dict:
+    """Column values of the summary of a complete round.
+
+    Pass the round's `tally` if it has already been computed.
+    """
+    t = tally or round_tally(holes, is_seed)
+    values = {column: getattr(t, name) for column, name in TALLY_COLUMNS.items()}
+    values.update(
+        round_id=round_id,
+        hole_count=len(holes),
+        total_putts=sum(putts for _, putts, _ in holes),
+        gir_count=sum(1 for gir, _, _ in holes if gir),
+        distance_counts={
+            d: [getattr(t, name)[i] for name in COUNT_FIELDS]
+            for i, d in enumerate(DISTANCES)
+            if t.first_attempts[i]
+        },
+    )
+    return values
+
+
+def summary_vector(scalars: Sequence[float], distance_counts: dict) -> list[float]:
+    """Tally vector (see Tally.as_vector) of one round from its summary columns.
+
+    `scalars` are the TALLY_COLUMNS values in order. Skips building a Tally,
+    which matters when turning thousands of rows into prefix sums.
+    """
+    n = len(DISTANCES)
+    vector = [1, *scalars] + [0] * (len(COUNT_FIELDS) * n)
+    base = len(scalars) + 1
+    for d, row in distance_counts.items():
+        i = DISTANCE_INDEX.get(d)
+        if i is not None:
+            for k, count in enumerate(row):
+                vector[base + k * n + i] = count
+    return vector
+
+
+def _add_distance_counts(t: Tally, counts: dict) -> None:
+    lists = [getattr(t, name) for name in COUNT_FIELDS]
+    for d, row in counts.items():
+        i = DISTANCE_INDEX.get(d)
+        if i is not None:
+            for values, n in zip(lists, row):
+                values[i] += n
+
+
+def write_summary(
+    session: Session, round_id: int, holes: list[HoleFacts], is_seed: bool,
+    tally: Optional[Tally] = None,
+) -> None:
+    session.merge(RoundSummary(**summary_values(round_id, holes, is_seed, tally)))
+
+
+def delete_summary(session: Session, round_id: int) -> None:
+    session.exec(delete(RoundSummary).where(RoundSummary.round_id == round_id))
+
+
+def load_summaries(session: Session, user: Optional[str] = None, include_seed: bool = True) -> list:
+    """Rows of (date, summary columns) for the complete rounds in scope, by date then id."""
+    return session.exec(
+        select(Round.date, *(getattr(RoundSummary, c) for c in [*TALLY_COLUMNS, "distance_counts"]))
+        .join(RoundSummary, RoundSummary.round_id == Round.id)
+        .where(round_filter(user, include_seed))
+        .order_by(Round.date, Round.id)
+    ).all()
+
+
+def compute_tally_summary(
+    session: Session, user: Optional[str] = None, include_seed: bool = True
+) -> Tally:
+    """Stats backend that sums the summary rows in scope."""
+    in_scope = round_filter(user, include_seed)
+    scalars = [func.coalesce(func.sum(getattr(RoundSummary, c)), 0) for c in TALLY_COLUMNS]
+    count, *sums = session.exec(
+        select(func.count(RoundSummary.round_id), *scalars).join(Round).where(in_scope)
+    ).one()
+
+    t = Tally(rounds=count)
+    for name, value in zip(TALLY_COLUMNS.values(), sums):
+        setattr(t, name, value)
+
+    # Sum the per-distance counts inside SQLite instead of decoding every row's JSON
+    counts = func.json_each(RoundSummary.distance_counts).table_valued("key", "value")
+    rows = session.exec(
+        select(
+            counts.c.key,
+            *(func.sum(func.json_extract(counts.c.value, f"$[{k}]")) for k in range(len(COUNT_FIELDS))),
+        )
+        .select_from(RoundSummary)
+        .join(Round)
+        .join(counts, true())
+        .where(in_scope)
+        .group_by(counts.c.key)
+    ).all()
+    _add_distance_counts(t, {d: row for d, *row in rows})
+    return t
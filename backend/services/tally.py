@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Optional
+
+from backend.constants import (
+    DEFAULT_SG_BASELINE,
+    DISTANCE_CODES,
+    DISTANCES,
+    DISTANCE_TO_FEET,
+    NO_PUTT_CODE,
+    UNKNOWN_DISTANCE_CODE,
+)
+from backend.services.baselines import BY_CODE, OFFSET_BY_CODE
+
+DISTANCE_INDEX = {d: i for i, d in enumerate(DISTANCES)}
+
+# Expected putts by distance code on the baseline Tally.sg is kept against
+SG_BY_CODE = BY_CODE[DEFAULT_SG_BASELINE]
+FEET_BY_CODE = {DISTANCE_CODES[d]: v for d, v in DISTANCE_TO_FEET.items()}
+
+# (gir, putts_taken, first putt distance code) - the only per-hole facts the stats need
+HoleFacts = tuple[bool, int, int]
+
+
+def distance_code(distance: Optional[str]) -> int:
+    """Code stored in Hole.first_putt_code for a first putt distance (None: no putts)."""
+    if distance is None:
+        return NO_PUTT_CODE
+    return DISTANCE_CODES.get(distance, UNKNOWN_DISTANCE_CODE)
+
+
+def pack_putts(distances: Iterable[str]) -> bytes:
+    """Hole.putt_codes for a hole's putt distances in order: one code per byte."""
+    return bytes(DISTANCE_CODES.get(d, UNKNOWN_DISTANCE_CODE) for d in distances)
+
+
+def unknown_putts(distances: Iterable[str]) -> list[tuple[int, str]]:
+    """(putt number, distance) of the putts whose label pack_putts can't keep; they go in Putt."""
+    return [(i + 1, d) for i, d in enumerate(distances) if d not in DISTANCE_CODES]
+
+
+def unpack_putts(codes: bytes, unknown: Optional[dict[int, str]] = None) -> list[str]:
+    """Putt distances from Hole.putt_codes, with labels of unknown putts by putt number."""
+    unknown = unknown or {}
+    return [
+        unknown[i + 1] if code == UNKNOWN_DISTANCE_CODE else DISTANCES[code - 1]
+        for i, code in enumerate(codes)
+    ]
+
+
+def drop_float_noise(value: float) -> float:
+    """A sum of stat inputs without the drift of long float additions.
+
+    SG baselines and approach distances are exact to a thousandth, so running
+    and prefix sums of them only pick up rounding noise far below 1e-6.
+    """
+    return round(value, 6)
+
+
+def _zeros() -> list[int]:
+    return [0] * len(DISTANCES)
+
+
+@dataclass
+class Tally:
+    """Additive running sums from which every dashboard stat is derived.
+
+    Tallies of disjoint sets of complete rounds can be added together, and a
+    round's tally can be subtracted again, so they can be maintained
+    incrementally instead of rescanning every hole.
+    """
+
+    rounds: int = 0
+    putts: int = 0  # normalized to 18 holes
+    sg: float = 0.0  # against DEFAULT_SG_BASELINE, normalized to 18 holes
+    non_gir_holes: int = 0
+    non_gir_one_putts: int = 0
+    gir_approach_ft: float = 0.0  # real rounds only
+    gir_approach_n: int = 0
+    non_gir_approach_ft: float = 0.0  # real rounds only
+    non_gir_approach_n: int = 0
+    sg_unknown_holes: int = 0  # putted from an unknown distance, normalized to 18 holes
+    first_attempts: list[int] = field(default_factory=_zeros)
+    first_makes: list[int] = field(default_factory=_zeros)
+    second_attempts: list[int] = field(default_factory=_zeros)
+    second_makes: list[int] = field(default_factory=_zeros)
+    # Holes putted from each distance, normalized to 18 holes: SG against
+    # another baseline moves by these times its offset (see sg_against)
+    sg_holes: list[int] = field(default_factory=_zeros)
+
+    def _combine(self, other: "Tally", sign: int) -> "Tally":
+        result = Tally()
+        for f in fields(self):
+            a, b = getattr(self, f.name), getattr(other, f.name)
+            if isinstance(a, list):
+                setattr(result, f.name, [x + sign * y for x, y in zip(a, b)])
+            else:
+                setattr(result, f.name, a + sign * b)
+        return result
+
+    def as_vector(self) -> list[float]:
+        """Flatten to one list: scalar fields, then each per-distance list."""
+        vector = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, list):
+                vector.extend(value)
+            else:
+                vector.append(value)
+        return vector
+
+    @classmethod
+    def from_vector(cls, vector: list[float]) -> "Tally":
+        """Inverse of as_vector()."""
+        t = cls()
+        pos = 0
+        for f in fields(t):
+            if isinstance(getattr(t, f.name), list):
+                setattr(t, f.name, list(vector[pos:pos + len(DISTANCES)]))
+                pos += len(DISTANCES)
+            else:
+                setattr(t, f.name, vector[pos])
+                pos += 1
+        return t
+
+    def sg_against(self, baseline: str) -> float:
+        """Total SG (normalized to 18 holes) against any baseline in SG_BASELINES."""
+        if baseline == DEFAULT_SG_BASELINE:
+            return self.sg
+        offsets = OFFSET_BY_CODE[baseline]
+        sg = self.sg + self.sg_unknown_holes * offsets[UNKNOWN_DISTANCE_CODE]
+        for i, n in enumerate(self.sg_holes):
+            sg += n * offsets[i + 1]
+        return sg
+
+    def __add__(self, other: "Tally") -> "Tally":
+        return self._combine(other, 1)
+
+    def __sub__(self, other: "Tally") -> "Tally":
+        return self._combine(other, -1)
+
+
+def round_tally(holes: Iterable[HoleFacts], is_seed: bool) -> Tally:
+    """Tally a single complete round from its per-hole facts."""
+    t = Tally(rounds=1)
+    holes = list(holes)
+    factor = 2 if len(holes) == 9 else 1
+
+    sg_round = 0.0
+    for gir, putts_taken, code in holes:
+        t.putts += putts_taken
+        if not gir:
+            t.non_gir_holes += 1
+            if putts_taken == 1:
+                t.non_gir_one_putts += 1
+
+        if code == NO_PUTT_CODE:
+            continue
+
+        sg_round += SG_BY_CODE[code] - putts_taken
+
+        feet = FEET_BY_CODE.get(code)
+        if not is_seed and feet is not None:
+            if gir:
+                t.gir_approach_ft += feet
+                t.gir_approach_n += 1
+            else:
+                t.non_gir_approach_ft += feet
+                t.non_gir_approach_n += 1
+
+        if code == UNKNOWN_DISTANCE_CODE:
+            t.sg_unknown_holes += 1
+            continue
+        idx = code - 1
+        t.sg_holes[idx] += 1
+        t.first_attempts[idx] += 1
+        if putts_taken == 1:
+            t.first_makes[idx] += 1
+        if putts_taken >= 2:
+            t.second_attempts[idx] += 1
+            if putts_taken == 2:
+                t.second_makes[idx] += 1
+
+    # Normalize 9-hole rounds to 18-hole equivalent
+    t.putts *= factor
+    t.sg = sg_round * factor
+    t.sg_unknown_holes *= factor
+    t.sg_holes = [n * factor for n in t.sg_holes]
+    return t
@@ -0,0 +1,133 @@
+"""Per-round trend series with moving averages.
+
+Each round is reduced to a few additive components (putts, SG, up & down and
+make-bucket attempts/makes), and every metric is a ratio of two component
+sums. A single pass over the round summaries keeps a sliding-window sum for
+the moving averages and, when downsampling, a per-bucket sum for the points.
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+from sqlmodel import Session
+
+from backend.constants import DEFAULT_SG_BASELINE, DISTANCE_CODES, UNKNOWN_DISTANCE_CODE
+from backend.services.baselines import OFFSET_BY_CODE
+from backend.services.summaries import COUNT_FIELDS, load_summaries
+from backend.services.tally import drop_float_noise
+
+DEFAULT_WINDOW = 10
+
+# Same buckets as the dashboard's make % gauges
+MAKE_BUCKETS = {
+    "make_pct_3ft": ["3ft"],
+    "make_pct_4_5ft": ["4ft", "5ft"],
+    "make_pct_6_7ft": ["6ft", "7ft"],
+}
+
+# Component sums per round
+COMPONENTS = [
+    "rounds", "putts", "sg", "ud_attempts", "ud_makes",
+    *(f"{name}_{part}" for name in MAKE_BUCKETS for part in ("attempts", "makes")),
+]
+_INDEX = {name: i for i, name in enumerate(COMPONENTS)}
+
+# metric -> (numerator, denominator, scale, decimals)
+METRICS = {
+    "putts_per_round": ("putts", "rounds", 1, 1),
+    "sg_putting": ("sg", "rounds", 1, 2),
+    "up_and_down_pct": ("ud_makes", "ud_attempts", 100, 1),
+    **{name: (f"{name}_makes", f"{name}_attempts", 100, 1) for name in MAKE_BUCKETS},
+}
+
+
+SG_HOLES = COUNT_FIELDS.index("sg_holes")
+
+
+def _round_sg(sg: float, sg_unknown_holes: int, distance_counts: dict, offsets: list[float]) -> float:
+    """A round's SG moved from the default baseline to the one `offsets` belongs to."""
+    sg += sg_unknown_holes * offsets[UNKNOWN_DISTANCE_CODE]
+    for d, row in distance_counts.items():
+        sg += row[SG_HOLES] * offsets[DISTANCE_CODES.get(d, UNKNOWN_DISTANCE_CODE)]
+    return drop_float_noise(sg)
+
+
+def _round_components(putts: int, sg: float, ud_attempts: int, ud_makes: int, distance_counts: dict) -> list:
+    values = [1, putts, sg, ud_attempts, ud_makes]
+    for distances in MAKE_BUCKETS.values():
+        # distance_counts rows are [first_attempts, first_makes, ...]
+        rows = [distance_counts.get(d) or (0, 0) for d in distances]
+        values += [sum(r[0] for r in rows), sum(r[1] for r in rows)]
+    return values
+
+
+def _metric(sums: list, metric: str) -> Optional[float]:
+    num, den, scale, decimals = METRICS[metric]
+    denominator = sums[_INDEX[den]]
+    if not denominator:
+        return None
+    numerator = drop_float_noise(sums[_INDEX[num]])
+    return round(numerator / denominator * scale, decimals)
+
+
+def compute_trends(
+    session: Session,
+    user: Optional[str] = None,
+    include_seed: bool = True,
+    window: int = DEFAULT_WINDOW,
+    max_points: Optional[int] = None,
+    baseline: str = DEFAULT_SG_BASELINE,
+) -> dict:
+    """Trend series over the complete rounds in scope, oldest first.
+
+    `value` is each point's own metric and `moving_avg` the metric over the
+    last `window` rounds up to that point. With `max_points`, consecutive
+    rounds are merged into at most that many points: a point's value pools
+    its rounds and its moving average is the one at its last round. SG is
+    against `baseline`.
+    """
+    offsets = OFFSET_BY_CODE[baseline]
+    rows = load_summaries(session, user, include_seed)
+    total = len(rows)
+    per_point = math.ceil(total / max_points) if max_points and total > max_points else 1
+
+    width = len(COMPONENTS)
+    recent: deque[list] = deque()
+    window_sums = [0] * width
+    bucket = [0] * width
+    dates: list[str] = []
+    rounds: list[int] = []
+    series = {m: {"value": [], "moving_avg": []} for m in METRICS}
+
+    # Rows are (date, *TALLY_COLUMNS, distance_counts)
+    for i, (round_date, putts, sg, ud_attempts, ud_makes, *_, sg_unknown_holes, distance_counts) in enumerate(rows):
+        if baseline != DEFAULT_SG_BASELINE:
+            sg = _round_sg(sg, sg_unknown_holes, distance_counts, offsets)
+        comp = _round_components(putts, sg, ud_attempts, ud_makes, distance_counts)
+        recent.append(comp)
+        for k in range(width):
+            window_sums[k] += comp[k]
+            bucket[k] += comp[k]
+        if len(recent) > window:
+            old = recent.popleft()
+            for k in range(width):
+                window_sums[k] -= old[k]
+
+        if (i + 1) % per_point and i + 1 < total:
+            continue
+        dates.append(round_date.isoformat())
+        rounds.append(bucket[0])
+        for metric, points in series.items():
+            points["value"].append(_metric(bucket, metric))
+            points["moving_avg"].append(_metric(window_sums, metric))
+        bucket = [0] * width
+
+    return {
+        "window": window,
+        "baseline": baseline,
+        "total_rounds": total,
+        "dates": dates,
+        "rounds": rounds,
+        "series": series,
+    }
@@ -0,0 +1,54 @@
+"""Rolling-window stats from per-round prefix sums.
+
+The round summaries of a scope are read once, ordered by date, and turned
+into cumulative Tallies. The tally of any run of consecutive rounds (the last
+N, or everything between two dates) is then the difference of two prefixes.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlmodel import Session
+
+from backend.services.summaries import load_summaries, summary_vector
+from backend.services.tally import Tally, drop_float_noise
+
+
+@dataclass
+class RoundSeries:
+    """Complete rounds of a scope in date order with their prefix tallies.
+
+    `prefix[i]` is the tally of the first i rounds as a Tally vector (see
+    Tally.as_vector), so `prefix[0]` is all zeros.
+    """
+
+    dates: list[date]
+    prefix: list[list[float]]
+
+    def window(
+        self,
+        last_n_rounds: Optional[int] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ) -> Tally:
+        """Tally of the rounds in [since, until], limited to the last N of them."""
+        lo = bisect_left(self.dates, since) if since else 0
+        hi = bisect_right(self.dates, until) if until else len(self.dates)
+        if last_n_rounds is not None:
+            lo = max(lo, hi - last_n_rounds)
+        if hi <= lo:
+            return Tally()
+        return Tally.from_vector(
+            [drop_float_noise(a - b) for a, b in zip(self.prefix[hi], self.prefix[lo])]
+        )
+
+
+def build_series(session: Session, user: Optional[str] = None, include_seed: bool = True) -> RoundSeries:
+    dates: list[date] = []
+    prefix = [Tally().as_vector()]
+    for round_date, *scalars, distance_counts in load_summaries(session, user, include_seed):
+        dates.append(round_date)
+        prefix.append([a + b for a, b in zip(prefix[-1], summary_vector(scalars, distance_counts))])
+    return RoundSeries(dates=dates, prefix=prefix)
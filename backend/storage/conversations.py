@@ -0,0 +1,34 @@
+"""Storage for saved bot conversations (see bot/conversation_store.py)."""
+
+import datetime as dt
+from typing import Optional
+
+from sqlalchemy import delete, insert
+
+from backend.storage.database import ConversationState, get_read_session, get_session
+
+# (state, user_data), or None once the conversation has ended
+Saved = Optional[tuple[int, dict]]
+
+
+def load_state(telegram_user_id: str) -> Saved:
+    with get_read_session() as session:
+        row = session.get(ConversationState, telegram_user_id)
+        return (row.state, row.data) if row else None
+
+
+def save_states(states: dict[str, Saved]) -> None:
+    """Write a batch of conversations in one transaction, deleting ended ones."""
+    now = dt.datetime.now(dt.timezone.utc)
+    with get_session() as session:
+        session.exec(
+            delete(ConversationState).where(ConversationState.telegram_user_id.in_(list(states)))
+        )
+        rows = [
+            {"telegram_user_id": user, "state": saved[0], "data": saved[1], "updated_at": now}
+            for user, saved in states.items()
+            if saved is not None
+        ]
+        if rows:
+            session.exec(insert(ConversationState), params=rows)
+        session.commit()
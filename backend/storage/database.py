@@ -1,19 +1,50 @@
 import datetime as dt
+import hashlib
+import time
 from typing import Optional
 
+from sqlalchemy import (
+    JSON,
+    Column,
+    Engine,
+    Index,
+    and_,
+    bindparam,
+    case,
+    delete,
+    event,
+    func,
+    inspect,
+    make_url,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlmodel import Field, Relationship, SQLModel, Session, create_engine
 
 from backend.config import settings
+from backend.constants import DISTANCE_CODES, NO_PUTT_CODE, UNKNOWN_DISTANCE_CODE
+from backend.services.metrics import DB_QUERY_SECONDS, record_query
+from backend.services.tally import pack_putts
 
 
 class Round(SQLModel, table=True):
     __tablename__ = "rounds"
+    __table_args__ = (
+        Index("ix_rounds_user_date", "telegram_user_id", "date"),
+        Index("ix_rounds_seed_date", "is_seed", "date"),
+        Index("ux_rounds_import_key", "import_key", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     telegram_user_id: str = ""
     date: dt.date = Field(default_factory=dt.date.today)
     course_name: Optional[str] = None
     is_seed: bool = False
+    import_key: Optional[str] = None  # set by the bulk importer, for idempotent re-runs
     created_at: dt.datetime = Field(
         default_factory=lambda: dt.datetime.now(dt.timezone.utc)
     )
@@ -23,19 +54,32 @@ class Round(SQLModel, table=True):
 
 class Hole(SQLModel, table=True):
     __tablename__ = "holes"
+    __table_args__ = (Index("ix_holes_round_hole", "round_id", "hole_number"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     round_id: int = Field(foreign_key="rounds.id")
     hole_number: int
     gir: bool = False
     putts_taken: int = 0
+    # constants.DISTANCE_CODES code of the first putt, so stats never read Putt
+    first_putt_code: Optional[int] = None
+    # Every putt's distance code in order, one byte each (tally.pack_putts);
+    # NULL until backfilled on databases that predate it
+    putt_codes: Optional[bytes] = None
 
     round: Optional[Round] = Relationship(back_populates="holes")
     putts: list["Putt"] = Relationship(back_populates="hole")
 
 
 class Putt(SQLModel, table=True):
+    """A putt whose distance label isn't one of DISTANCES (the importer accepts any).
+
+    Hole.putt_codes holds UNKNOWN_DISTANCE_CODE in its place; this keeps the
+    label. Putts from the bot's distances have no row here.
+    """
+
     __tablename__ = "putts"
+    __table_args__ = (Index("ix_putts_hole_putt", "hole_id", "putt_number"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     hole_id: int = Field(foreign_key="holes.id")
@@ -45,12 +89,294 @@ class Putt(SQLModel, table=True):
     hole: Optional[Hole] = Relationship(back_populates="putts")
 
 
-engine = create_engine(settings.database_url, echo=False)
+class StatTotal(SQLModel, table=True):
+    """Running sums over complete rounds for one aggregate scope."""
+
+    __tablename__ = "stat_totals"
+
+    scope: str = Field(primary_key=True)  # "all" or "user:<telegram_user_id>"
+    rounds: int = 0
+    putts: int = 0
+    sg: float = 0.0
+    non_gir_holes: int = 0
+    non_gir_one_putts: int = 0
+    gir_approach_ft: float = 0.0
+    gir_approach_n: int = 0
+    non_gir_approach_ft: float = 0.0
+    non_gir_approach_n: int = 0
+    # Nullable so older databases gain it; NULL until the aggregates are rebuilt
+    sg_unknown_holes: Optional[int] = 0
+
+
+class StatCounter(SQLModel, table=True):
+    """Per-distance 1st/2nd putt counters for one aggregate scope."""
+
+    __tablename__ = "stat_counters"
+
+    scope: str = Field(primary_key=True)
+    distance: str = Field(primary_key=True)
+    first_attempts: int = 0
+    first_makes: int = 0
+    second_attempts: int = 0
+    second_makes: int = 0
+    sg_holes: Optional[int] = 0  # normalized to 18 holes; NULL until rebuilt
+
+
+class RoundSummary(SQLModel, table=True):
+    """Per-round rollup, present only while the round is complete (9 or 18 holes)."""
+
+    __tablename__ = "round_summaries"
+
+    round_id: int = Field(foreign_key="rounds.id", primary_key=True)
+    hole_count: int
+    total_putts: int
+    normalized_putts: int  # scaled to 18 holes
+    sg: float  # scaled to 18 holes
+    gir_count: int
+    up_down_attempts: int  # non-GIR holes
+    up_down_makes: int  # non-GIR one-putts
+    gir_approach_ft: float = 0.0  # real rounds only
+    gir_approach_n: int = 0
+    non_gir_approach_ft: float = 0.0  # real rounds only
+    non_gir_approach_n: int = 0
+    sg_unknown_holes: Optional[int] = 0  # scaled to 18 holes; NULL until rebuilt
+    # {distance: [first_attempts, first_makes, second_attempts, second_makes, sg_holes]}
+    distance_counts: dict = Field(default_factory=dict, sa_column=Column(JSON))
+
+
+class ConversationState(SQLModel, table=True):
+    """Saved bot conversation of one player, so rounds survive restarts."""
+
+    __tablename__ = "conversation_states"
+
+    telegram_user_id: str = Field(primary_key=True)
+    state: int
+    data: dict = Field(default_factory=dict, sa_column=Column(JSON))  # context.user_data
+    updated_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.timezone.utc)
+    )
+
+
+class DataVersion(SQLModel, table=True):
+    """Single-row counter bumped by every write that can change the stats."""
+
+    __tablename__ = "data_version"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = 0
+    # aggregates.AGGREGATES_VERSION as of the last full rebuild; NULL until the first one
+    aggregates_version: Optional[int] = None
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _apply_pragmas(dbapi_conn, read_only: bool) -> None:
+    cursor = dbapi_conn.cursor()
+    if settings.sqlite_wal and not read_only:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+def _create_engines() -> tuple[Engine, Engine]:
+    """Build the writer engine and the read-only reader engine.
+
+    For file-backed SQLite, all writes go through a single pooled connection,
+    so writers queue in Python instead of failing with "database is locked",
+    while stats reads use a separate pool of read-only connections that WAL
+    lets run alongside the writer. Other databases share one engine.
+    """
+    url = settings.database_url
+    if not _is_sqlite_file(url):
+        writer = create_engine(url, echo=False)
+        return writer, writer
+
+    writer = create_engine(
+        url,
+        echo=False,
+        pool_size=1,
+        max_overflow=0,
+        connect_args={"check_same_thread": False},
+    )
+    path = make_url(url).database
+    reader = create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        echo=False,
+        pool_size=settings.db_read_pool_size,
+        max_overflow=0,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(writer, "connect", lambda conn, _: _apply_pragmas(conn, read_only=False))
+    event.listen(reader, "connect", lambda conn, _: _apply_pragmas(conn, read_only=True))
+    return writer, reader
+
+
+def _time_queries(target: Engine, pool: str) -> None:
+    """Record the duration of every statement run on `target`."""
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info.pop("query_start")
+        DB_QUERY_SECONDS.observe(seconds, pool=pool)
+        record_query(seconds)
+
+
+engine, read_engine = _create_engines()
+_time_queries(engine, "writer")
+if read_engine is not engine:
+    _time_queries(read_engine, "reader")
+
+
+def _schema_fingerprint() -> int:
+    """Hash of the DDL for every model table and index, as a positive 32-bit int."""
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    return int(hashlib.sha1("\n".join(ddl).encode()).hexdigest()[:7], 16) or 1
 
 
 def init_db() -> None:
+    """Create or upgrade the schema.
+
+    On SQLite the fingerprint of the schema is kept in PRAGMA user_version,
+    so a boot against an up-to-date database skips the table, column and
+    index checks and the backfills entirely.
+    """
+    sqlite = engine.dialect.name == "sqlite"
+    fingerprint = _schema_fingerprint()
+    if sqlite:
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() == fingerprint:
+                return
+
     SQLModel.metadata.create_all(engine)
+    # create_all skips existing tables, so add columns and indexes introduced later
+    _add_missing_columns()
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    _backfill_first_putt_codes()
+    _pack_putt_codes()
+
+    if sqlite:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+
+
+def _add_missing_columns() -> None:
+    """Add nullable columns that were added to a model after its table was created."""
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'))
+
+
+def _backfill_first_putt_codes() -> None:
+    """Fill Hole.first_putt_code from the Putt table where it is missing.
+
+    Holes written before the column existed have NULL; new holes get the
+    code when they are written.
+    """
+    first_code = (
+        select(case(DISTANCE_CODES, value=Putt.distance, else_=UNKNOWN_DISTANCE_CODE))
+        .where(Putt.hole_id == Hole.id)
+        .order_by(Putt.putt_number)
+        .limit(1)
+        .correlate(Hole)
+        .scalar_subquery()
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            update(Hole)
+            .where(Hole.first_putt_code.is_(None))
+            .values(first_putt_code=func.coalesce(first_code, NO_PUTT_CODE))
+        )
+
+
+PACK_CHUNK_HOLES = 10_000
+
+
+def _pack_putt_codes() -> None:
+    """Fill Hole.putt_codes from the Putt table where it is missing, then drop
+    the Putt rows it makes redundant (every label in DISTANCES).
+
+    Runs once per database, in chunks of holes so memory stays flat.
+    """
+    last_id = 0
+    with engine.begin() as conn:
+        while True:
+            ids = conn.execute(
+                select(Hole.id)
+                .where(Hole.putt_codes.is_(None), Hole.id > last_id)
+                .order_by(Hole.id)
+                .limit(PACK_CHUNK_HOLES)
+            ).scalars().all()
+            if not ids:
+                break
+            distances: dict[int, list[str]] = {hole_id: [] for hole_id in ids}
+            for hole_id, distance in conn.execute(
+                select(Putt.hole_id, Putt.distance)
+                .where(Putt.hole_id.between(ids[0], ids[-1]))
+                .order_by(Putt.hole_id, Putt.putt_number)
+            ):
+                if hole_id in distances:
+                    distances[hole_id].append(distance)
+            conn.execute(
+                update(Hole)
+                .where(Hole.id == bindparam("hole_id"))
+                .values(putt_codes=bindparam("codes")),
+                [{"hole_id": h, "codes": pack_putts(d)} for h, d in distances.items()],
+            )
+            last_id = ids[-1]
+        if last_id:
+            conn.execute(delete(Putt).where(Putt.distance.in_(list(DISTANCE_CODES))))
 
 
 def get_session() -> Session:
+    """Session on the writer connection. Use for anything that writes."""
     return Session(engine)
+
+
+def get_read_session() -> Session:
+    """Session on the read-only pool, for stats and other queries."""
+    return Session(read_engine)
+
+
+def bump_data_version(session: Session) -> None:
+    """Mark the stats as changed. Runs in the caller's transaction."""
+    result = session.exec(
+        update(DataVersion).where(DataVersion.id == 1).values(version=DataVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        session.add(DataVersion(id=1, version=1))
+
+
+def get_data_version() -> int:
+    with get_read_session() as session:
+        row = session.get(DataVersion, 1)
+        return row.version if row else 0
+
+
+def round_filter(user: Optional[str], include_seed: bool):
+    """SQL condition on Round selecting the rounds in a stats scope."""
+    if user is None:
+        return true() if include_seed else Round.is_seed == False
+    own = and_(Round.telegram_user_id == user, Round.is_seed == False)
+    return or_(own, Round.is_seed == True) if include_seed else own
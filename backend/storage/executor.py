@@ -0,0 +1,31 @@
+"""Run blocking database work off the event loop.
+
+The bot handlers, the webhook and the API share one asyncio event loop, so a
+slow commit (e.g. an fsync) executed inline would stall every other user.
+`run_db()` hands the work to a small dedicated thread pool instead; its
+size bounds how many database operations run at once. The work runs in the
+caller's context, so metric traces follow it onto the pool thread.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from backend.config import settings
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.db_workers, thread_name_prefix="db"
+)
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run `fn(*args, **kwargs)` on the DB executor and await its result."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, functools.partial(context.run, fn, *args, **kwargs)
+    )
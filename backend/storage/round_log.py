@@ -0,0 +1,144 @@
+"""Write path for logging rounds from the bot.
+
+Each operation is one short transaction with no read-after-write refresh:
+ids come back from the INSERT itself. A hole is written once, when it is
+finished, together with its putts and the aggregate update, so logging a
+hole costs a single commit however many taps it took.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterator, Optional
+
+from sqlalchemy import event, func, insert
+from sqlmodel import Session, select
+
+from backend.services.aggregates import record_hole_finished
+from backend.services.deletion import delete_rounds_where
+from backend.services.tally import distance_code, pack_putts, unknown_putts
+from backend.storage.database import (
+    Hole,
+    Putt,
+    Round,
+    bump_data_version,
+    engine,
+    get_read_session,
+    get_session,
+)
+
+
+@dataclass
+class WriteStats:
+    """Write amplification of the bot write path.
+
+    Writes run on several DB executor threads, so counts go through add().
+    """
+
+    holes: int = 0
+    commits: int = 0
+    statements: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, holes: int = 0, commits: int = 0, statements: int = 0) -> None:
+        with self._lock:
+            self.holes += holes
+            self.commits += commits
+            self.statements += statements
+
+    def per_hole(self) -> dict:
+        with self._lock:
+            holes, commits, statements = self.holes, self.commits, self.statements
+        per = holes or 1
+        return {
+            "holes": holes,
+            "commits_per_hole": round(commits / per, 2),
+            "statements_per_hole": round(statements / per, 2),
+        }
+
+
+write_stats = WriteStats()
+_local = threading.local()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "counting", False):
+        write_stats.add(statements=1)
+
+
+@contextmanager
+def _transaction() -> Iterator[Session]:
+    """Yield a session and commit it once, counting statements and commits."""
+    _local.counting = True
+    try:
+        with get_session() as session:
+            yield session
+            session.commit()
+            write_stats.add(commits=1)
+    finally:
+        _local.counting = False
+
+
+def create_round(telegram_user_id: str) -> int:
+    with _transaction() as session:
+        round_obj = Round(telegram_user_id=telegram_user_id, date=date.today())
+        session.add(round_obj)
+        session.flush()
+        return round_obj.id
+
+
+def save_hole(
+    round_id: int,
+    hole_number: int,
+    gir: bool,
+    putt_distances: list[str],
+    putts_taken: int,
+) -> Optional[int]:
+    """Write a finished hole and its putts, and update the aggregates.
+
+    Returns None, writing nothing, if the round no longer exists (e.g. it
+    was purged while the player was still logging it).
+    """
+    with _transaction() as session:
+        hole = Hole(
+            round_id=round_id,
+            hole_number=hole_number,
+            gir=gir,
+            putts_taken=putts_taken,
+            first_putt_code=distance_code(putt_distances[0] if putt_distances else None),
+            putt_codes=pack_putts(putt_distances),
+        )
+        session.add(hole)
+        session.flush()
+        # The bot's distances all fit in putt_codes, so this is normally empty
+        unknown = unknown_putts(putt_distances)
+        if unknown:
+            session.exec(
+                insert(Putt),
+                params=[{"hole_id": hole.id, "putt_number": n, "distance": d} for n, d in unknown],
+            )
+        if not record_hole_finished(session, round_id):
+            session.rollback()
+            return None
+        bump_data_version(session)
+        write_stats.add(holes=1)
+        return hole.id
+
+
+def round_progress(round_id: int) -> Optional[tuple[int, int]]:
+    """(holes logged, total putts) of a round, or None if it doesn't exist."""
+    with get_read_session() as session:
+        if session.get(Round, round_id) is None:
+            return None
+        holes, putts = session.exec(
+            select(func.count(Hole.id), func.coalesce(func.sum(Hole.putts_taken), 0))
+            .where(Hole.round_id == round_id)
+        ).one()
+        return holes, putts
+
+
+def delete_round(round_id: int) -> None:
+    with _transaction() as session:
+        delete_rounds_where(session, Round.id == round_id)
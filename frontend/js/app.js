@@ -9,9 +9,46 @@ const DISTANCES = [
     '40ft', '50ft', '50ft+',
 ];
 
+// Dashboard scope from the page URL, e.g. /?user=12345&include_seed=false&window=last10&baseline=scratch
+const pageParams = new URLSearchParams(window.location.search);
+
+// Rolling windows offered by the dashboard, as /api/stats parameters
+const WINDOWS = {
+    all: {},
+    last10: { last_n_rounds: 10 },
+    last20: { last_n_rounds: 20 },
+    season: { since: `${new Date().getFullYear()}-01-01` },
+};
+
+// SG baselines offered by the dashboard, as shown in the SG gauge title
+const BASELINE_NAMES = {
+    tour: 'Tour',
+    scratch: 'Scratch',
+    hcp10: '10 hcp',
+    hcp20: '20 hcp',
+};
+
+function statsQuery() {
+    const params = new URLSearchParams();
+    if (pageParams.get('user')) {
+        params.set('user', pageParams.get('user'));
+    }
+    params.set('include_seed', document.getElementById('include-seed').checked);
+    const windowParams = WINDOWS[document.getElementById('window').value] || {};
+    for (const [key, value] of Object.entries(windowParams)) {
+        params.set(key, value);
+    }
+    params.set('baseline', document.getElementById('baseline').value);
+    return params.toString();
+}
+
+// The stats being shown, kept up to date by live deltas
+let currentStats = null;
+let liveSource = null;
+
 async function loadStats() {
     try {
-        const resp = await fetch('/api/stats');
+        const resp = await fetch(`/api/stats?${statsQuery()}`);
         const stats = await resp.json();
         renderDashboard(stats);
     } catch (err) {
@@ -19,112 +56,219 @@ async function loadStats() {
     }
 }
 
+// Each gauge with the stats it shows: a delta re-renders only the gauges whose stats changed
+const GAUGES = [
+    {
+        keys: ['putts_per_round'],
+        render: stats => createGauge({
+            container: 'gauge-ppr',
+            title: 'Putts Per Round',
+            value: stats.putts_per_round,
+            displayValue: stats.putts_per_round.toFixed(1),
+            goal: stats.goals.putts_per_round,
+            goalLabel: `< ${stats.goals.putts_per_round}`,
+            min: 26,
+            max: 40,
+            invertColor: true,
+        }),
+    },
+    {
+        keys: ['up_and_down_pct'],
+        render: stats => createGauge({
+            container: 'gauge-updown',
+            title: 'Up & Down %',
+            value: stats.up_and_down_pct,
+            displayValue: stats.up_and_down_pct.toFixed(1),
+            goal: stats.goals.up_and_down_pct,
+            goalLabel: `${stats.goals.up_and_down_pct}%`,
+            min: 0,
+            max: 100,
+            unit: '%',
+        }),
+    },
+    {
+        keys: ['non_gir_approach_ft', 'non_gir_approach_display'],
+        render: stats => createGauge({
+            container: 'gauge-approach',
+            title: 'Non-GIR Approach',
+            value: stats.non_gir_approach_ft,
+            displayValue: stats.non_gir_approach_display,
+            goal: stats.goals.non_gir_approach_ft,
+            goalLabel: `< ${stats.goals.non_gir_approach_ft}ft`,
+            min: 0,
+            max: 30,
+            invertColor: true,
+        }),
+    },
+    {
+        keys: ['sg_putting', 'sg_baseline'],
+        render: stats => createGauge({
+            container: 'gauge-sg',
+            title: `SG: Putting vs ${BASELINE_NAMES[stats.sg_baseline] || stats.sg_baseline}`,
+            value: stats.sg_putting,
+            displayValue: (stats.sg_putting >= 0 ? '+' : '') + stats.sg_putting.toFixed(2),
+            goal: stats.goals.sg_putting,
+            goalLabel: '> 0',
+            min: -5,
+            max: 5,
+        }),
+    },
+    {
+        keys: ['make_pct_3ft'],
+        render: stats => createGauge({
+            container: 'gauge-3ft',
+            title: '3ft Make %',
+            value: stats.make_pct_3ft,
+            displayValue: stats.make_pct_3ft.toFixed(1),
+            goal: stats.goals.make_pct_3ft,
+            goalLabel: `${stats.goals.make_pct_3ft}%`,
+            min: 0,
+            max: 100,
+            unit: '%',
+        }),
+    },
+    {
+        keys: ['make_pct_4_5ft'],
+        render: stats => createGauge({
+            container: 'gauge-4-5ft',
+            title: '4-5ft Make %',
+            value: stats.make_pct_4_5ft,
+            displayValue: stats.make_pct_4_5ft.toFixed(1),
+            goal: stats.goals.make_pct_4_5ft,
+            goalLabel: `${stats.goals.make_pct_4_5ft}%`,
+            min: 0,
+            max: 100,
+            unit: '%',
+        }),
+    },
+    {
+        keys: ['make_pct_6_7ft'],
+        render: stats => createGauge({
+            container: 'gauge-6-7ft',
+            title: '6-7ft Make %',
+            value: stats.make_pct_6_7ft,
+            displayValue: stats.make_pct_6_7ft.toFixed(1),
+            goal: stats.goals.make_pct_6_7ft,
+            goalLabel: `${stats.goals.make_pct_6_7ft}%`,
+            min: 0,
+            max: 100,
+            unit: '%',
+        }),
+    },
+];
+
 function renderDashboard(stats) {
-    // Total rounds
+    currentStats = stats;
     document.getElementById('total-rounds').textContent = stats.total_rounds;
 
-    // Gauges
-    createGauge({
-        container: 'gauge-ppr',
-        title: 'Putts Per Round',
-        value: stats.putts_per_round,
-        displayValue: stats.putts_per_round.toFixed(1),
-        goal: stats.goals.putts_per_round,
-        goalLabel: `< ${stats.goals.putts_per_round}`,
-        min: 26,
-        max: 40,
-        invertColor: true,
-    });
-
-    createGauge({
-        container: 'gauge-updown',
-        title: 'Up & Down %',
-        value: stats.up_and_down_pct,
-        displayValue: stats.up_and_down_pct.toFixed(1),
-        goal: stats.goals.up_and_down_pct,
-        goalLabel: `${stats.goals.up_and_down_pct}%`,
-        min: 0,
-        max: 100,
-        unit: '%',
-    });
-
-    createGauge({
-        container: 'gauge-approach',
-        title: 'Non-GIR Approach',
-        value: stats.non_gir_approach_ft,
-        displayValue: stats.non_gir_approach_display,
-        goal: stats.goals.non_gir_approach_ft,
-        goalLabel: `< ${stats.goals.non_gir_approach_ft}ft`,
-        min: 0,
-        max: 30,
-        invertColor: true,
-    });
-
-    createGauge({
-        container: 'gauge-sg',
-        title: 'SG: Putting',
-        value: stats.sg_putting,
-        displayValue: (stats.sg_putting >= 0 ? '+' : '') + stats.sg_putting.toFixed(2),
-        goal: stats.goals.sg_putting,
-        goalLabel: '> 0',
-        min: -5,
-        max: 5,
-    });
-
-    createGauge({
-        container: 'gauge-3ft',
-        title: '3ft Make %',
-        value: stats.make_pct_3ft,
-        displayValue: stats.make_pct_3ft.toFixed(1),
-        goal: stats.goals.make_pct_3ft,
-        goalLabel: `${stats.goals.make_pct_3ft}%`,
-        min: 0,
-        max: 100,
-        unit: '%',
-    });
-
-    createGauge({
-        container: 'gauge-4-5ft',
-        title: '4-5ft Make %',
-        value: stats.make_pct_4_5ft,
-        displayValue: stats.make_pct_4_5ft.toFixed(1),
-        goal: stats.goals.make_pct_4_5ft,
-        goalLabel: `${stats.goals.make_pct_4_5ft}%`,
-        min: 0,
-        max: 100,
-        unit: '%',
-    });
-
-    createGauge({
-        container: 'gauge-6-7ft',
-        title: '6-7ft Make %',
-        value: stats.make_pct_6_7ft,
-        displayValue: stats.make_pct_6_7ft.toFixed(1),
-        goal: stats.goals.make_pct_6_7ft,
-        goalLabel: `${stats.goals.make_pct_6_7ft}%`,
-        min: 0,
-        max: 100,
-        unit: '%',
-    });
+    for (const gauge of GAUGES) {
+        gauge.render(stats);
+    }
 
     // Putting table
     const tbody = document.getElementById('putting-tbody');
     tbody.innerHTML = '';
     for (const dist of DISTANCES) {
-        const first = stats.first_putt_stats[dist] || { pct: 0, attempts: 0 };
-        const second = stats.second_putt_stats[dist] || { pct: 0, attempts: 0 };
         const row = document.createElement('tr');
-        row.innerHTML = `
-            <td>${dist}</td>
-            <td>${first.attempts > 0 ? first.pct + '%' : '--'}</td>
-            <td>${second.attempts > 0 ? second.pct + '%' : '--'}</td>
-        `;
+        row.id = puttRowId(dist);
         tbody.appendChild(row);
+        renderPuttRow(dist);
     }
 
     // Other stats
     document.getElementById('gir-approach').textContent = stats.gir_approach_display;
 }
 
+function puttRowId(dist) {
+    return `putt-row-${DISTANCES.indexOf(dist)}`;
+}
+
+function renderPuttRow(dist) {
+    const first = currentStats.first_putt_stats[dist] || { pct: 0, attempts: 0 };
+    const second = currentStats.second_putt_stats[dist] || { pct: 0, attempts: 0 };
+    document.getElementById(puttRowId(dist)).innerHTML = `
+        <td>${dist}</td>
+        <td>${first.attempts > 0 ? first.pct + '%' : '--'}</td>
+        <td>${second.attempts > 0 ? second.pct + '%' : '--'}</td>
+    `;
+}
+
+// Merge a live update (only the changed stats and table rows) and re-render what it touches
+function applyDelta(delta) {
+    for (const [key, value] of Object.entries(delta)) {
+        if (key === 'first_putt_stats' || key === 'second_putt_stats') {
+            Object.assign(currentStats[key], value);
+        } else {
+            currentStats[key] = value;
+        }
+    }
+
+    if ('total_rounds' in delta) {
+        document.getElementById('total-rounds').textContent = currentStats.total_rounds;
+    }
+    for (const gauge of GAUGES) {
+        if (gauge.keys.some(key => key in delta)) {
+            gauge.render(currentStats);
+        }
+    }
+    const rows = new Set([
+        ...Object.keys(delta.first_putt_stats || {}),
+        ...Object.keys(delta.second_putt_stats || {}),
+    ]);
+    for (const dist of rows) {
+        renderPuttRow(dist);
+    }
+    if ('gir_approach_display' in delta) {
+        document.getElementById('gir-approach').textContent = currentStats.gir_approach_display;
+    }
+}
+
+// Live updates: the stream sends the full stats first, then deltas as rounds are logged
+function connectLive() {
+    if (liveSource) {
+        liveSource.close();
+    }
+    liveSource = new EventSource(`/api/stats/live?${statsQuery()}`);
+    liveSource.addEventListener('stats', event => renderDashboard(JSON.parse(event.data)));
+    liveSource.addEventListener('delta', event => {
+        if (currentStats) {
+            applyDelta(JSON.parse(event.data));
+        }
+    });
+}
+
+function refresh() {
+    if (window.EventSource) {
+        connectLive();
+    } else {
+        loadStats();
+    }
+}
+
 // Load on page ready
-document.addEventListener('DOMContentLoaded', loadStats);
+document.addEventListener('DOMContentLoaded', () => {
+    const includeSeed = document.getElementById('include-seed');
+    includeSeed.checked = pageParams.get('include_seed') !== 'false';
+    includeSeed.addEventListener('change', () => {
+        pageParams.set('include_seed', includeSeed.checked);
+        history.replaceState(null, '', `?${pageParams.toString()}`);
+        refresh();
+    });
+
+    const windowSelect = document.getElementById('window');
+    windowSelect.value = WINDOWS[pageParams.get('window')] ? pageParams.get('window') : 'all';
+    windowSelect.addEventListener('change', () => {
+        pageParams.set('window', windowSelect.value);
+        history.replaceState(null, '', `?${pageParams.toString()}`);
+        refresh();
+    });
+
+    const baselineSelect = document.getElementById('baseline');
+    baselineSelect.value = BASELINE_NAMES[pageParams.get('baseline')] ? pageParams.get('baseline') : 'tour';
+    baselineSelect.addEventListener('change', () => {
+        pageParams.set('baseline', baselineSelect.value);
+        history.replaceState(null, '', `?${pageParams.toString()}`);
+        refresh();
+    });
+    refresh();
+});
@@ -0,0 +1,87 @@
+"""
+Benchmark the stats backends on growing synthetic histories.
+
+Usage: python -m scripts.bench_stats [--sizes 10000,100000,1000000] [--backends full,sql,numpy,summary,aggregate]
+
+Runs against a scratch SQLite database that is grown to each size in turn.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+_scratch = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/bench.db"
+
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from backend.services.aggregates import scope_tally  # noqa: E402
+from backend.services.importer import import_rounds  # noqa: E402
+from backend.services.stats_numpy import load_hole_arrays, tally_from_arrays  # noqa: E402
+from backend.services.stats_service import compute_stats_full, stats_from_tally  # noqa: E402
+from backend.services.stats_sql import compute_tally_sql  # noqa: E402
+from backend.services.summaries import compute_tally_summary  # noqa: E402
+from backend.storage.database import Hole, get_session, init_db  # noqa: E402
+from scripts.synthetic import generate_rounds  # noqa: E402
+
+
+def _grow_to(total_holes: int, seed: int) -> None:
+    """Import synthetic rounds until the database holds `total_holes` holes."""
+    with get_session() as session:
+        have = session.exec(select(func.count()).select_from(Hole)).one()
+    import_rounds(generate_rounds(total_holes - have, users=50, seed=seed))
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _tally_with(tally_fn):
+    def run():
+        with get_session() as session:
+            return stats_from_tally(tally_fn(session))
+    return run
+
+
+def _numpy_phases() -> tuple[float, float]:
+    with get_session() as session:
+        start = time.perf_counter()
+        cols = load_hole_arrays(session)
+        loaded = time.perf_counter()
+        tally_from_arrays(cols)
+        return loaded - start, time.perf_counter() - loaded
+
+
+BACKENDS = {
+    "full": compute_stats_full,
+    "sql": _tally_with(compute_tally_sql),
+    "numpy": _tally_with(lambda s: tally_from_arrays(load_hole_arrays(s))),
+    "summary": _tally_with(compute_tally_summary),
+    "aggregate": _tally_with(lambda s: scope_tally(s, None, True)),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    args = parser.parse_args()
+
+    init_db()
+    backends = args.backends.split(",")
+    print(f"{'holes':>9}  " + "  ".join(f"{b:>10}" for b in backends))
+    for i, size in enumerate(int(s) for s in args.sizes.split(",")):
+        _grow_to(size, seed=i)
+        timings = [_time(BACKENDS[b]) for b in backends]
+        print(f"{size:>9}  " + "  ".join(f"{t * 1000:>8.1f}ms" for t in timings))
+        if "numpy" in backends:
+            load, kernel = _numpy_phases()
+            print(f"{'':>9}  numpy: load {load * 1000:.1f}ms, kernel {kernel * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Benchmark suite: stats, the bot hole-logging path and imports at growing sizes.
+
+Usage: python -m scripts.bench_suite [--sizes 1000,10000,100000,1000000] [--out bench_results.json]
+                                     [--compare baseline.json] [--threshold 1.25]
+
+A scratch SQLite database is grown through each size with reproducible
+synthetic histories (scripts/synthetic.py). At every size the suite times:
+
+  - compute_stats() for each stats backend, for everyone and for one player
+  - the seed fixture import, and bulk import cost per 1000 rows
+  - full 18-hole rounds logged through the real bot handlers by concurrent
+    players, with a stubbed Telegram Bot API (scripts/stub_telegram.py)
+
+Results are written as JSON: a flat "metrics" map of seconds (lower is
+better) keyed "<name>@<holes>", so two runs can be compared. With --compare,
+any metric slower than the baseline by more than --threshold (and by more
+than --min-delta seconds) is reported and the exit status is 1.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+_scratch = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/bench.db"
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:bench")
+
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from telegram import Update  # noqa: E402
+
+from backend.bot.conversation_store import conversation_store  # noqa: E402
+from backend.bot.handlers import build_bot_app  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.services.deletion import purge_rounds  # noqa: E402
+from backend.services.importer import import_file, import_rounds  # noqa: E402
+from backend.services.stats_service import compute_stats  # noqa: E402
+from backend.storage.database import Hole, get_session, init_db  # noqa: E402
+from scripts.seed_dummy_data import FIXTURE_PATH  # noqa: E402
+from scripts.stub_telegram import StubRequest  # noqa: E402
+from scripts.synthetic import generate_rounds  # noqa: E402
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+DEFAULT_BACKENDS = "aggregate,summary,sql,numpy"
+# Synthetic dates end here so every run generates the same histories
+END_DATE = date(2025, 1, 1)
+BOT_PLAYER_BASE = 900_000
+
+
+# --- Helpers ---
+
+
+def _median_time(fn, repeat: int) -> float:
+    fn()  # warm up: lazy imports, page cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[round(pct / 100 * (len(ordered) - 1))]
+
+
+def _hole_count() -> int:
+    with get_session() as session:
+        return session.exec(select(func.count()).select_from(Hole)).one()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+# --- Benchmarks ---
+
+
+def bench_grow(total_holes: int, users: int, seed: int) -> dict:
+    """Import synthetic rounds until the database holds `total_holes` holes."""
+    missing = total_holes - _hole_count()
+    if missing <= 0:
+        return {}
+    result = import_rounds(generate_rounds(missing, users=users, seed=seed, end=END_DATE))
+    rows = result.rounds + result.holes + result.putts
+    return {"import.sec_per_1k_rows": result.seconds / rows * 1000}
+
+
+def bench_seed_import(repeat: int) -> dict:
+    """Time loading the seed fixture, removing the previous copy first."""
+    timings = []
+    for _ in range(repeat):
+        purge_rounds(is_seed=True)
+        timings.append(import_file(FIXTURE_PATH, telegram_user_id="seed", is_seed=True).seconds)
+    return {"seed_import": statistics.median(timings)}
+
+
+def bench_stats(backends: list[str], repeat: int) -> dict:
+    metrics = {}
+    for backend in backends:
+        settings.stats_backend = backend
+        metrics[f"stats.{backend}"] = _median_time(compute_stats, repeat)
+        metrics[f"stats.{backend}.user"] = _median_time(lambda: compute_stats(user="1"), repeat)
+    return metrics
+
+
+def _round_taps(record: dict) -> list[list[str]]:
+    """Callback data a player taps for each hole of a synthetic round."""
+    holes = []
+    for hole in record["holes"]:
+        dists = [p["distance"] for p in hole["putts"]]
+        taps = [f"dist:{dists[0]}", "gir:yes" if hole["gir"] else "gir:no"]
+        if dists[0] != "Gimmie":
+            taps += [f"dist:{d}" for d in dists[1:]] + ["dist:0"]
+        holes.append(taps)
+    return holes
+
+
+class _Player:
+    def __init__(self, app, user_id: int):
+        self.app = app
+        self.user = {"id": user_id, "is_bot": False, "first_name": "Bench"}
+        self.chat = {"id": user_id, "type": "private"}
+        self.update_id = user_id * 10_000
+
+    async def send(self, payload: dict) -> None:
+        self.update_id += 1
+        data = {"update_id": self.update_id, **payload}
+        await self.app.process_update(Update.de_json(data, self.app.bot))
+
+    async def command(self, text: str) -> None:
+        await self.send({"message": {
+            "message_id": self.update_id, "date": 0, "text": text, "from": self.user,
+            "chat": self.chat,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        }})
+
+    async def tap(self, data: str) -> None:
+        await self.send({"callback_query": {
+            "id": str(self.update_id), "from": self.user, "chat_instance": "bench", "data": data,
+            "message": {"message_id": 1, "date": 0, "chat": self.chat},
+        }})
+
+    async def play(self, record: dict, hole_times: list[float]) -> None:
+        await self.command("/round")
+        await self.tap(f"holes:{len(record['holes'])}")
+        for taps in _round_taps(record):
+            start = time.perf_counter()
+            for data in taps:
+                await self.tap(data)
+            hole_times.append(time.perf_counter() - start)
+
+
+async def _bot_rounds(players: int, seed: int) -> tuple[list[float], float]:
+    app = build_bot_app(request=StubRequest())
+    await app.initialize()
+    rounds = generate_rounds(18 * players, users=players, seed=seed, nine_hole_share=0, end=END_DATE)
+    hole_times: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _Player(app, BOT_PLAYER_BASE + i).play(record, hole_times)
+        for i, record in enumerate(rounds)
+    ))
+    await conversation_store.flush()
+    elapsed = time.perf_counter() - start
+    await app.shutdown()
+    return hole_times, elapsed
+
+
+def bench_bot(players: int, seed: int) -> dict:
+    """Log one 18-hole round per player, all players concurrently."""
+    hole_times, elapsed = asyncio.run(_bot_rounds(players, seed))
+    # Keep the database at the synthetic size for the next benchmarks
+    for i in range(players):
+        purge_rounds(user=str(BOT_PLAYER_BASE + i))
+    return {
+        "bot.hole_p50": _percentile(hole_times, 50),
+        "bot.hole_p99": _percentile(hole_times, 99),
+        "bot.sec_per_hole": elapsed / len(hole_times),
+    }
+
+
+# --- Results ---
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list[str]:
+    """Metrics in `results` slower than `baseline` by more than the threshold."""
+    regressions = []
+    for name, old in sorted(baseline["metrics"].items()):
+        new = results["metrics"].get(name)
+        if new is None or old <= 0:
+            continue
+        if new > old * threshold and new - old > min_delta:
+            regressions.append(
+                f"{name}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms ({new / old:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="holes, comma separated")
+    parser.add_argument("--users", type=int, default=50, help="synthetic players")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS, help='add "full" for the reference scan')
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per measurement")
+    parser.add_argument("--bot-players", type=int, default=8, help="concurrent players logging rounds")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to check against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio")
+    parser.add_argument("--min-delta", type=float, default=0.002, help="ignore slowdowns under this many seconds")
+    args = parser.parse_args()
+
+    init_db()
+    backends = args.backends.split(",")
+    metrics: dict[str, float] = {}
+    for i, size in enumerate(int(s) for s in args.sizes.split(",")):
+        found = {
+            **bench_grow(size, args.users, seed=i),
+            **bench_seed_import(args.repeat),
+            **bench_stats(backends, args.repeat),
+            **bench_bot(args.bot_players, seed=1000 + i),
+        }
+        print(f"{size} holes")
+        for name, seconds in found.items():
+            print(f"  {name:<28} {seconds * 1000:>10.2f}ms")
+            metrics[f"{name}@{size}"] = seconds
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "users": args.users,
+            "repeat": args.repeat,
+            "bot_players": args.bot_players,
+        },
+        "metrics": metrics,
+    }
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {len(metrics)} metrics to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against {args.compare} (threshold {args.threshold}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
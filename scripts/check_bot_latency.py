@@ -0,0 +1,121 @@
+"""
+Check that concurrent bot conversations don't stall behind each other's commits.
+
+Usage: python -m scripts.check_bot_latency [--players 8] [--commit-delay-ms 100]
+                                           [--stall-budget-ms 30] [--tap-budget-ms 60]
+
+Runs the real bot handlers against a stubbed Bot API (scripts/stub_telegram.py)
+on a scratch database, with every commit slowed down by --commit-delay-ms as
+a slow fsync would. The players log 9-hole rounds at the same time while a
+probe on the event loop measures how late it gets to run.
+
+  - event loop stall (p99, max): how late the probe woke. Commits run on
+    the DB executor, so stalls stay far below one commit delay however slow
+    commits are. The p99 is budgeted: the max moves with OS scheduling on
+    small machines, while commits run on the loop push every stall past
+    the commit delay.
+  - tap latency (p99): taps that don't finish a hole. They write nothing,
+    so they must not wait for other players' commits.
+  - hole latency (p50/max): taps that write a hole. These queue for the one
+    writer connection, so they are reported, not budgeted.
+
+The exit status is 1 if the stall or the tap latency is over its budget.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_scratch = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/latency.db"
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:bench")
+
+from sqlalchemy import event  # noqa: E402
+
+from backend.bot.conversation_store import conversation_store  # noqa: E402
+from backend.bot.handlers import build_bot_app  # noqa: E402
+from backend.storage.database import engine, init_db  # noqa: E402
+from scripts.bench_suite import _percentile, _Player, _round_taps  # noqa: E402
+from scripts.stub_telegram import StubRequest  # noqa: E402
+from scripts.synthetic import generate_rounds  # noqa: E402
+
+PLAYER_BASE = 800_000
+PROBE_SECONDS = 0.005
+
+
+class _TimedPlayer(_Player):
+    async def play(self, record: dict, taps: list[float], holes: list[float]) -> None:
+        await self.command("/round")
+        await self.tap(f"holes:{len(record['holes'])}")
+        for hole_taps in _round_taps(record):
+            for i, data in enumerate(hole_taps):
+                start = time.perf_counter()
+                await self.tap(data)
+                # The last tap of a hole is the one that writes it
+                (holes if i == len(hole_taps) - 1 else taps).append(time.perf_counter() - start)
+
+
+async def _probe(stalls: list[float], done: asyncio.Event) -> None:
+    """Record how much later than asked the event loop wakes this task."""
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_SECONDS)
+        stalls.append(time.perf_counter() - start - PROBE_SECONDS)
+
+
+async def _run(players: int) -> tuple[list[float], list[float], list[float]]:
+    app = build_bot_app(request=StubRequest())
+    await app.initialize()
+    rounds = generate_rounds(9 * players, users=players, seed=0, nine_hole_share=1)
+    taps: list[float] = []
+    holes: list[float] = []
+    stalls: list[float] = []
+    done = asyncio.Event()
+    probe = asyncio.create_task(_probe(stalls, done))
+    await asyncio.gather(*(
+        _TimedPlayer(app, PLAYER_BASE + i).play(record, taps, holes)
+        for i, record in enumerate(rounds)
+    ))
+    await conversation_store.flush()
+    done.set()
+    await probe
+    await app.shutdown()
+    return taps, holes, stalls
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=8, help="concurrent conversations")
+    parser.add_argument("--commit-delay-ms", type=float, default=100, help="delay added to every commit")
+    parser.add_argument("--stall-budget-ms", type=float, default=30, help="for the p99 stall")
+    parser.add_argument("--tap-budget-ms", type=float, default=60)
+    args = parser.parse_args()
+
+    init_db()
+    delay = args.commit_delay_ms / 1000
+    event.listen(engine, "commit", lambda conn: time.sleep(delay))
+    taps, holes, stalls = asyncio.run(_run(args.players))
+
+    stall_ms = _percentile(stalls, 99) * 1000
+    tap_ms = _percentile(taps, 99) * 1000
+    print(f"{args.players} players, {len(holes)} holes, {args.commit_delay_ms:.0f}ms per commit")
+    print(f"  event loop stall (p99)      {stall_ms:8.1f}ms  (budget {args.stall_budget_ms:.0f}ms)")
+    print(f"  event loop stall (max)      {max(stalls) * 1000:8.1f}ms")
+    print(f"  tap latency (p99)           {tap_ms:8.1f}ms  (budget {args.tap_budget_ms:.0f}ms)")
+    print(f"  hole latency (p50 / max)    {_percentile(holes, 50) * 1000:8.1f}ms / {max(holes) * 1000:.1f}ms")
+
+    failures = []
+    if stall_ms > args.stall_budget_ms:
+        failures.append(f"event loop stall p99 {stall_ms:.0f}ms > budget {args.stall_budget_ms:.0f}ms")
+    if tap_ms > args.tap_budget_ms:
+        failures.append(f"tap latency p99 {tap_ms:.0f}ms > budget {args.tap_budget_ms:.0f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
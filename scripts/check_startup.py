@@ -0,0 +1,146 @@
+"""
+Measure cold start and check it against budgets.
+
+Usage: python -m scripts.check_startup [--holes 100000] [--runs 3]
+                                       [--import-budget-ms 1500] [--ready-budget-ms 3000]
+
+Every measurement starts a fresh interpreter with no TELEGRAM_BOT_TOKEN, as
+a dashboard-only container scaling up from zero would:
+
+  - import: importing backend.main. The bot stack (python-telegram-bot and
+    the handlers) must not be loaded.
+  - ready: starting uvicorn until /api/stats first answers 200, against a
+    scratch database of --holes synthetic holes whose schema is current.
+  - ready (schema check): the same with PRAGMA user_version cleared, so
+    init_db() runs the full table/column/index checks and backfills, as
+    every boot did before the schema fingerprint. Reported, not budgeted.
+
+The exit status is 1 if a bot module was imported or a budget was exceeded.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import httpx
+
+_scratch = tempfile.mkdtemp()
+DB_PATH = os.path.join(_scratch, "startup.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from backend.services.aggregates import ensure_aggregates  # noqa: E402
+from backend.services.importer import import_rounds  # noqa: E402
+from backend.storage.database import init_db  # noqa: E402
+from scripts.synthetic import generate_rounds  # noqa: E402
+
+BOT_MODULES = ("telegram", "backend.bot.handlers", "backend.bot.update_queue")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+ms = (time.perf_counter() - start) * 1000
+loaded = sorted(m for m in {BOT_MODULES!r} if m in sys.modules)
+print(json.dumps({{"ms": ms, "bot_modules": loaded}}))
+"""
+
+
+def _env() -> dict:
+    return {
+        **os.environ,
+        "TELEGRAM_BOT_TOKEN": "",
+        "WORKER_DIR": _scratch,
+        "PYTHONPATH": os.getcwd(),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(timeout: float = 60) -> float:
+    """Milliseconds from starting uvicorn to the first 200 from /api/stats."""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise SystemExit("uvicorn exited during startup")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/stats").status_code == 200:
+                    return (time.perf_counter() - start) * 1000
+            except httpx.TransportError:
+                time.sleep(0.005)
+        raise SystemExit(f"/api/stats not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _clear_schema_version() -> None:
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--holes", type=int, default=100_000, help="synthetic holes in the database")
+    parser.add_argument("--runs", type=int, default=3, help="measurements per figure (median)")
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--ready-budget-ms", type=float, default=3000)
+    args = parser.parse_args()
+
+    init_db()
+    import_rounds(generate_rounds(args.holes, users=20, seed=0, end=date(2025, 1, 1)))
+    ensure_aggregates()
+    print(f"Scratch database: {args.holes} holes")
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_ms = statistics.median(i["ms"] for i in imports)
+    bot_modules = sorted({m for i in imports for m in i["bot_modules"]})
+    ready_ms = statistics.median(measure_ready() for _ in range(args.runs))
+    checked = []
+    for _ in range(args.runs):
+        _clear_schema_version()
+        checked.append(measure_ready())
+    schema_ms = statistics.median(checked)
+
+    failures = []
+    if bot_modules:
+        failures.append(f"bot modules imported without a token: {', '.join(bot_modules)}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import {import_ms:.0f}ms > budget {args.import_budget_ms:.0f}ms")
+    if ready_ms > args.ready_budget_ms:
+        failures.append(f"ready {ready_ms:.0f}ms > budget {args.ready_budget_ms:.0f}ms")
+
+    print(f"  import backend.main         {import_ms:8.0f}ms  (budget {args.import_budget_ms:.0f}ms)")
+    print(f"  ready                       {ready_ms:8.0f}ms  (budget {args.ready_budget_ms:.0f}ms)")
+    print(f"  ready (schema check)        {schema_ms:8.0f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Check that every stats backend returns the same stats as the full scan,
+with SG against every baseline.
+
+Usage: python -m scripts.check_stats_parity [--fixture]
+
+With --fixture, runs against a scratch database loaded from the seed
+fixture instead of the configured database.
+"""
+
+import os
+import sys
+import tempfile
+
+if "--fixture" in sys.argv:
+    _scratch = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/parity.db"
+
+from sqlmodel import select  # noqa: E402
+
+from backend.services.aggregates import ensure_aggregates, scope_tally  # noqa: E402
+from backend.services.baselines import BASELINES  # noqa: E402
+from backend.services.stats_service import compute_stats_full, stats_from_tally  # noqa: E402
+from backend.services.stats_numpy import compute_tally_numpy  # noqa: E402
+from backend.services.stats_sql import compute_tally_sql  # noqa: E402
+from backend.services.summaries import compute_tally_summary  # noqa: E402
+from backend.storage.database import Round, get_session, init_db  # noqa: E402
+
+BACKENDS = {
+    "aggregate": scope_tally,
+    "summary": compute_tally_summary,
+    "sql": compute_tally_sql,
+    "numpy": compute_tally_numpy,
+}
+
+
+def _scopes() -> list[tuple[str | None, bool]]:
+    with get_session() as session:
+        users = session.exec(
+            select(Round.telegram_user_id).where(Round.is_seed == False).distinct()
+        ).all()
+    scopes: list[tuple[str | None, bool]] = [(None, True), (None, False)]
+    for user in users:
+        scopes += [(user, True), (user, False)]
+    return scopes
+
+
+def main() -> int:
+    init_db()
+    ensure_aggregates()
+    if "--fixture" in sys.argv:
+        from scripts.seed_dummy_data import seed
+        seed()
+
+    failures = 0
+    for user, include_seed in _scopes():
+        expected = compute_stats_full(user, include_seed, BASELINES)
+        for name, tally_fn in BACKENDS.items():
+            with get_session() as session:
+                actual = stats_from_tally(tally_fn(session, user, include_seed), BASELINES)
+            diffs = [k for k in expected if expected[k] != actual.get(k)]
+            if diffs:
+                failures += 1
+                print(f"{name} (user={user}, include_seed={include_seed}) differs: {', '.join(diffs)}")
+
+    if failures:
+        return 1
+    print("All stats backends match the full scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
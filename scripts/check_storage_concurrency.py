@@ -0,0 +1,136 @@
+"""
+Check that stats reads and bot writes run side by side on the SQLite storage profile.
+
+Usage: python -m scripts.check_storage_concurrency [--holes 20000] [--writers 4]
+                                                   [--readers 4] [--rounds 3]
+
+On a scratch file-backed database with --holes synthetic holes, --writers
+threads log 18-hole rounds hole by hole with save_hole() (the bot's write
+path, on the writer connection) while --readers threads keep calling
+compute_stats() on every stats backend (on the read-only pool) until the
+writers finish. Afterwards the aggregates are checked against a full scan
+with check_aggregates() for every scope that was written to.
+
+The exit status is 1 if any read or write failed ("database is locked" or
+any other error) or if the aggregates don't match the raw tables.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from itertools import cycle
+
+_scratch = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/concurrency.db"
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from backend.config import settings  # noqa: E402
+from backend.services.aggregates import ensure_aggregates  # noqa: E402
+from backend.services.importer import import_rounds  # noqa: E402
+from backend.services.stats_service import check_aggregates, compute_stats  # noqa: E402
+from backend.storage.database import init_db  # noqa: E402
+from backend.storage.round_log import create_round, save_hole  # noqa: E402
+from scripts.synthetic import generate_rounds  # noqa: E402
+
+BACKENDS = ("aggregate", "summary", "sql", "numpy", "full")
+WRITER_BASE = 700_000
+TAPS = [["10ft", "Gimmie"], ["4ft"], ["25ft", "3ft", "Gimmie"], ["6ft", "Gimmie"]]
+
+
+class _Failures:
+    def __init__(self):
+        self.locked = 0
+        self.errors: list[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, exc: Exception) -> None:
+        with self._lock:
+            if isinstance(exc, OperationalError):
+                self.locked += 1
+            self.errors.append(traceback.format_exception_only(exc)[0].splitlines()[0])
+
+
+def _write(player: int, rounds: int, failures: _Failures) -> int:
+    holes = 0
+    for _ in range(rounds):
+        try:
+            round_id = create_round(str(WRITER_BASE + player))
+            for hole_number in range(1, 19):
+                putts = TAPS[(player + hole_number) % len(TAPS)]
+                save_hole(round_id, hole_number, hole_number % 3 == 0, putts, len(putts))
+                holes += 1
+        except Exception as exc:
+            failures.record(exc)
+    return holes
+
+
+def _read(backends, done: threading.Event, failures: _Failures) -> int:
+    reads = 0
+    while not done.is_set():
+        # The backend is read per call, so switching it here picks the next one
+        settings.stats_backend = next(backends)
+        try:
+            compute_stats()
+            compute_stats(user=str(WRITER_BASE), include_seed=False)
+            reads += 2
+        except Exception as exc:
+            failures.record(exc)
+    return reads
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--holes", type=int, default=20_000, help="synthetic history to read")
+    parser.add_argument("--writers", type=int, default=4, help="threads logging rounds")
+    parser.add_argument("--readers", type=int, default=4, help="threads computing stats")
+    parser.add_argument("--rounds", type=int, default=3, help="18-hole rounds per writer")
+    args = parser.parse_args()
+
+    init_db()
+    import_rounds(generate_rounds(args.holes, users=10, seed=0, end=date(2025, 1, 1)))
+    ensure_aggregates()
+    print(f"Scratch database: {args.holes} holes, WAL={settings.sqlite_wal}")
+
+    failures = _Failures()
+    done = threading.Event()
+    backends = cycle(BACKENDS)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.readers + args.writers) as pool:
+        readers = [pool.submit(_read, backends, done, failures) for _ in range(args.readers)]
+        writers = [pool.submit(_write, i, args.rounds, failures) for i in range(args.writers)]
+        holes = sum(w.result() for w in writers)
+        done.set()
+        reads = sum(r.result() for r in readers)
+    elapsed = time.perf_counter() - start
+
+    scopes = [(None, True), (None, False)] + [
+        (str(WRITER_BASE + i), False) for i in range(args.writers)
+    ]
+    drifted = []
+    for user, include_seed in scopes:
+        try:
+            keys = check_aggregates(user, include_seed)
+        except Exception as exc:
+            failures.record(exc)
+            continue
+        if keys:
+            drifted.append(f"user={user} include_seed={include_seed}: {', '.join(keys)}")
+
+    print(f"  {holes} holes written and {reads} stats reads in {elapsed:.1f}s")
+    print(f"  failed calls: {len(failures.errors)} ({failures.locked} OperationalError)")
+    for error in sorted(set(failures.errors)):
+        print(f"FAIL: {error}")
+    for drift in drifted:
+        print(f"FAIL: aggregates differ from a full scan for {drift}")
+    return 1 if failures.errors or drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
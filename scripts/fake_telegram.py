@@ -0,0 +1,97 @@
+"""
+Local stand-in for the Telegram Bot API server.
+
+Usage: python -m scripts.fake_telegram [--host 127.0.0.1] [--port 8081]
+
+Point the bot at it with TELEGRAM_API_URL=http://127.0.0.1:8081 to run the
+app without Telegram. Every Bot API method (getMe, setWebhook,
+answerCallbackQuery, editMessageText, sendMessage, ...) succeeds with the
+canned results of scripts/stub_telegram.py. The load generator
+(scripts/load_webhook.py) runs it in-process to watch the bot's replies.
+
+It is a bare ASGI app rather than a FastAPI one: under load it shares a
+process with the simulated golfers, so it has to stay out of their way.
+"""
+
+import argparse
+import json
+import logging
+from collections import Counter
+from typing import Callable
+from urllib.parse import parse_qsl
+
+import uvicorn
+
+from scripts.stub_telegram import api_result
+
+logger = logging.getLogger(__name__)
+
+_HEADERS = [(b"content-type", b"application/json")]
+
+
+def _decode(value: str):
+    # python-telegram-bot sends each parameter JSON-encoded in a form field
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _params(content_type: bytes, body: bytes) -> dict:
+    if content_type.startswith(b"application/json"):
+        return json.loads(body or b"{}")
+    return {k: _decode(v) for k, v in parse_qsl(body.decode())}
+
+
+class FakeBotApi:
+    """ASGI app answering POST /bot<token>/<method>.
+
+    `on_call(method, params)`, if given, sees every call the bot makes.
+    """
+
+    def __init__(self, on_call: Callable[[str, dict], None] | None = None):
+        self.on_call = on_call
+        self.calls: Counter = Counter()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+
+        prefix, _, method = scope["path"].rpartition("/")
+        if scope["method"] == "GET" and scope["path"] == "/calls":
+            payload = dict(self.calls)
+        elif scope["method"] == "POST" and prefix.startswith("/bot"):
+            headers = dict(scope["headers"])
+            params = _params(headers.get(b"content-type", b""), body)
+            self.calls[method] += 1
+            logger.debug("%s %s", method, params)
+            if self.on_call:
+                self.on_call(method, params)
+            payload = {"ok": True, "result": api_result(method, params)}
+        else:
+            payload = {"ok": False, "error_code": 404, "description": "Not Found"}
+
+        await send({"type": "http.response.start", "status": 200, "headers": _HEADERS})
+        await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    uvicorn.run(FakeBotApi(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Bulk import rounds from a JSON, NDJSON or CSV file.
+
+Usage: python -m scripts.import_rounds FILE [--format json|ndjson|csv] [--user ID] [--seed] [--batch-size N]
+
+JSON files use the data/seed_data.json layout (or a bare array of rounds),
+NDJSON has one round per line and CSV one row per putt with the columns
+listed in backend.services.importer.CSV_COLUMNS. Re-running an import skips
+rounds that were already imported. A round that repeats a hole number stops
+the import there.
+"""
+
+import argparse
+from pathlib import Path
+
+from backend.services.aggregates import ensure_aggregates
+from backend.services.importer import BATCH_ROUNDS, READERS, ImportResult, import_file
+from backend.storage.database import init_db
+
+
+def _report(result: ImportResult) -> None:
+    print(
+        f"  {result.rounds} rounds, {result.holes} holes, {result.putts} putts "
+        f"({result.skipped} skipped) - {result.rows_per_sec:,.0f} rows/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import rounds.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=sorted(READERS))
+    parser.add_argument("--user", default="", help="telegram_user_id for rounds that don't set one")
+    parser.add_argument("--seed", action="store_true", help="mark rounds as seed data")
+    parser.add_argument("--batch-size", type=int, default=BATCH_ROUNDS, help="rounds per transaction")
+    args = parser.parse_args()
+
+    init_db()
+    ensure_aggregates()
+    try:
+        result = import_file(
+            args.path,
+            fmt=args.format,
+            telegram_user_id=args.user,
+            is_seed=args.seed,
+            batch_rounds=args.batch_size,
+            progress=_report,
+        )
+    except ValueError as exc:
+        raise SystemExit(f"Import stopped: {exc}")
+    print(
+        f"Imported {result.rounds} rounds ({result.skipped} skipped) "
+        f"in {result.seconds:.2f}s - {result.rows_per_sec:,.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Load-test the webhook with simulated golfers playing full rounds.
+
+Usage: python -m scripts.load_webhook [--golfers 50] [--rounds 2] [--app http://127.0.0.1:8000]
+                                      [--api-port 8081] [--think-ms 0] [--secret ...]
+
+Starts a fake Telegram Bot API (scripts/fake_telegram.py) on --api-port and
+waits for the app, which must run in webhook mode against it:
+
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=1:load \\
+    BOT_MODE=webhook WEBHOOK_URL=http://127.0.0.1:8000 uvicorn backend.main:app
+
+Each golfer plays 9/18-hole rounds from the synthetic model in
+scripts/synthetic.py, posting /round and then the button taps the
+conversation expects (holes, 1st putt, GIR, next putts / Made It) to
+/webhook. After every update it waits for the bot's reply to arrive at the
+fake API, as a player waits for the keyboard to change, and checks the reply
+matches the conversation state it should be in. A golfer whose reply is
+wrong or missing counts a state error and sends /cancel to start over.
+
+Reports updates per second, update-to-reply latency and the state errors.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+import uvicorn
+
+from scripts.fake_telegram import FakeBotApi
+from scripts.synthetic import generate_rounds
+
+GOLFER_BASE = 800_000
+REPLY_METHODS = ("sendMessage", "editMessageText")
+
+
+@dataclass
+class Report:
+    updates: int = 0
+    retries: int = 0  # 503 answers from a full queue, retried after Retry-After
+    rounds: int = 0
+    holes: int = 0
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    examples: dict[str, str] = field(default_factory=dict)
+
+    def error(self, kind: str, detail: str) -> None:
+        self.errors[kind] += 1
+        self.examples.setdefault(kind, detail)
+
+
+class StateError(Exception):
+    def __init__(self, kind: str, detail: str):
+        super().__init__(detail)
+        self.kind = kind
+
+
+class Replies:
+    """Routes what the bot sends to the fake API back to the golfer waiting for it."""
+
+    def __init__(self):
+        self._waiting: dict[int, asyncio.Future] = {}
+
+    def expect(self, user_id: int) -> asyncio.Future:
+        future = self._waiting[user_id] = asyncio.get_running_loop().create_future()
+        return future
+
+    def on_call(self, method: str, params: dict) -> None:
+        if method in REPLY_METHODS:
+            user_id = int(params.get("chat_id", 0))
+        elif method == "answerCallbackQuery" and params.get("text"):
+            # A popup instead of a new keyboard; query ids are "<user>:<n>"
+            user_id = int(str(params["callback_query_id"]).split(":")[0])
+        else:
+            return
+        future = self._waiting.pop(user_id, None)
+        if future and not future.done():
+            future.set_result(params.get("text", ""))
+
+
+def _expected_replies(record: dict):
+    """Yield (callback data, expected reply prefix) for every tap of a round."""
+    n = len(record["holes"])
+    yield f"holes:{n}", f"Starting {n}-hole round! Hole 1 of {n}."
+    total = 0
+    for hole in record["holes"]:
+        h = hole["hole_number"]
+        dists = [p["distance"] for p in hole["putts"]]
+        total += hole["putts_taken"]
+        done = (
+            f"Round complete! {total} total putts in {n} holes."
+            if h == n
+            else f"Hole {h} done. Total putts so far: {total}"
+        )
+        gir = "GIR" if hole["gir"] else "Non-GIR"
+        gir_data = "gir:yes" if hole["gir"] else "gir:no"
+        if dists[0] == "Gimmie":
+            yield "dist:Gimmie", f"Hole {h}: Gimmie (1 putt)"
+            yield gir_data, done
+            continue
+        yield f"dist:{dists[0]}", f"Hole {h}: 1st putt from {dists[0]}"
+        yield gir_data, f"Hole {h} ({gir}): 1st putt from {dists[0]}"
+        for k, d in enumerate(dists[1:], start=2):
+            yield f"dist:{d}", f"Hole {h}: Putt {k} from {d}"
+        yield "dist:0", done
+
+
+class Golfer:
+    def __init__(self, user_id: int, client: httpx.AsyncClient, replies: Replies, args, report: Report):
+        self.user_id = user_id
+        self.client = client
+        self.replies = replies
+        self.args = args
+        self.report = report
+        self.user = {"id": user_id, "is_bot": False, "first_name": "Load"}
+        self.chat = {"id": user_id, "type": "private"}
+        self.taps = itertools.count(1)
+
+    async def _post(self, update: dict, stage: str, expect: str) -> None:
+        future = self.replies.expect(self.user_id)
+        start = time.perf_counter()
+        while True:
+            response = await self.client.post("/webhook", json=update)
+            self.report.updates += 1
+            if response.status_code != 503:
+                break
+            self.report.retries += 1
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+        if response.status_code != 200:
+            raise StateError(f"HTTP {response.status_code}", f"{stage}: {response.text[:80]}")
+        try:
+            text = await asyncio.wait_for(future, self.args.timeout)
+        except asyncio.TimeoutError:
+            raise StateError(f"no reply to {stage}", f"expected {expect!r}") from None
+        self.report.latencies.append(time.perf_counter() - start)
+        if not text.startswith(expect):
+            raise StateError(f"wrong reply to {stage}", f"expected {expect!r}, got {text[:60]!r}")
+        if self.args.think_ms:
+            await asyncio.sleep(self.args.think_ms / 1000)
+
+    async def command(self, text: str, expect: str) -> None:
+        n = next(self.taps)
+        await self._post({
+            "update_id": self.user_id * 100_000 + n,
+            "message": {
+                "message_id": n, "date": int(time.time()), "text": text,
+                "from": self.user, "chat": self.chat,
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+            },
+        }, text, expect)
+
+    async def tap(self, data: str, expect: str) -> None:
+        n = next(self.taps)
+        await self._post({
+            "update_id": self.user_id * 100_000 + n,
+            "callback_query": {
+                "id": f"{self.user_id}:{n}", "from": self.user, "chat_instance": "load",
+                "data": data,
+                "message": {"message_id": 1, "date": int(time.time()), "chat": self.chat},
+            },
+        }, data.split(":")[0], expect)
+
+    async def play(self, records: list[dict]) -> None:
+        for record in records:
+            try:
+                await self.command("/round", "How many holes?")
+                for data, expect in _expected_replies(record):
+                    await self.tap(data, expect)
+                self.report.rounds += 1
+                self.report.holes += len(record["holes"])
+            except StateError as exc:
+                self.report.error(exc.kind, str(exc))
+                try:
+                    await self.command("/cancel", "")
+                except StateError:
+                    pass
+
+
+async def _wait_for_app(client: httpx.AsyncClient, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/webhook/stats")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise SystemExit("The app's webhook queue isn't running: is it in webhook mode?")
+        await asyncio.sleep(0.5)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+def print_report(report: Report, elapsed: float, golfers: int) -> dict:
+    lat = sorted(report.latencies)
+    summary = {
+        "golfers": golfers,
+        "rounds": report.rounds,
+        "holes": report.holes,
+        "updates": report.updates,
+        "retries": report.retries,
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(report.updates / elapsed, 1) if elapsed else 0,
+        "latency_p50_ms": round(lat[len(lat) // 2] * 1000, 2) if lat else None,
+        "latency_p99_ms": round(lat[int(0.99 * (len(lat) - 1))] * 1000, 2) if lat else None,
+        "latency_mean_ms": round(statistics.fmean(lat) * 1000, 2) if lat else None,
+        "state_errors": dict(report.errors),
+    }
+    print(f"Golfers: {golfers}  rounds completed: {report.rounds}  holes: {report.holes}")
+    print(
+        f"Updates: {report.updates} in {elapsed:.1f}s = {summary['updates_per_sec']}/s"
+        f"  (503 retries: {report.retries})"
+    )
+    if lat:
+        print(
+            f"Update -> reply latency: p50 {_ms(lat[len(lat) // 2])}"
+            f"  p99 {_ms(lat[int(0.99 * (len(lat) - 1))])}  max {_ms(lat[-1])}"
+        )
+    if report.errors:
+        print("State errors:")
+        for kind, count in report.errors.most_common():
+            print(f"  {count:>5}  {kind}  (e.g. {report.examples[kind]})")
+    else:
+        print("State errors: none")
+    return summary
+
+
+async def run(args) -> dict:
+    replies = Replies()
+    server = uvicorn.Server(uvicorn.Config(
+        FakeBotApi(replies.on_call), host="127.0.0.1", port=args.api_port, log_level="warning"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    headers = {"X-Telegram-Bot-Api-Secret-Token": args.secret} if args.secret else {}
+    limits = httpx.Limits(max_connections=args.golfers, max_keepalive_connections=args.golfers)
+    report = Report()
+    try:
+        async with httpx.AsyncClient(base_url=args.app, headers=headers, limits=limits) as client:
+            print(f"Fake Bot API on :{args.api_port}, waiting for {args.app} ...")
+            await _wait_for_app(client, args.wait)
+            rounds = list(generate_rounds(
+                args.rounds * args.golfers * 18, users=args.golfers, seed=args.seed,
+                nine_hole_share=args.nine_hole_share,
+            ))
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                Golfer(GOLFER_BASE + i, client, replies, args, report).play(
+                    rounds[i::args.golfers][:args.rounds]
+                )
+                for i in range(args.golfers)
+            ))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        await server_task
+    return print_report(report, elapsed, args.golfers)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default="http://127.0.0.1:8000", help="base URL of the app")
+    parser.add_argument("--api-port", type=int, default=8081, help="port for the fake Bot API")
+    parser.add_argument("--golfers", type=int, default=50, help="concurrent golfers")
+    parser.add_argument("--rounds", type=int, default=2, help="rounds per golfer")
+    parser.add_argument("--nine-hole-share", type=float, default=0.1)
+    parser.add_argument("--think-ms", type=float, default=0, help="pause after each reply")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds to wait for a reply")
+    parser.add_argument("--secret", default="", help="webhook secret, if the app sets one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wait", type=float, default=60, help="seconds to wait for the app")
+    parser.add_argument("--out", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["state_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
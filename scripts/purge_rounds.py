@@ -0,0 +1,44 @@
+"""
+Delete rounds, with their holes and putts, by user, seed flag or date range.
+
+Usage: python -m scripts.purge_rounds [--user ID] [--seed | --real] [--since DATE] [--until DATE] [--dry-run]
+
+Criteria are combined, and at least one is required. Aggregates and round
+summaries are updated in the same transaction.
+"""
+
+import argparse
+import sys
+from datetime import date
+
+from backend.services.aggregates import ensure_aggregates
+from backend.services.deletion import count_rounds, purge_rounds
+from backend.storage.database import init_db
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Delete rounds in bulk.")
+    parser.add_argument("--user", help="telegram_user_id whose rounds to delete")
+    seed = parser.add_mutually_exclusive_group()
+    seed.add_argument("--seed", dest="is_seed", action="store_const", const=True, help="only seed rounds")
+    seed.add_argument("--real", dest="is_seed", action="store_const", const=False, help="only non-seed rounds")
+    parser.add_argument("--since", type=date.fromisoformat, help="first date to delete (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last date to delete (YYYY-MM-DD)")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be deleted")
+    args = parser.parse_args()
+
+    init_db()
+    ensure_aggregates()
+    criteria = {"user": args.user, "is_seed": args.is_seed, "since": args.since, "until": args.until}
+    try:
+        result = count_rounds(**criteria) if args.dry_run else purge_rounds(**criteria)
+    except ValueError as exc:
+        print(exc)
+        return 2
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(f"{verb} {result.rounds} rounds, {result.holes} holes, {result.putts} putts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
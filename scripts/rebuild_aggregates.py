@@ -0,0 +1,36 @@
+"""
+Rebuild the stat aggregates and round summaries from the raw rounds/holes/putts tables.
+
+Usage: python -m scripts.rebuild_aggregates [--check]
+
+With --check, only compares the stored aggregates against a full scan,
+after the one-off build that startup does for databases that predate them
+(or their SG columns, which are NULL until then).
+"""
+
+import sys
+
+from backend.services.aggregates import ensure_aggregates, rebuild_aggregates
+from backend.services.stats_service import check_aggregates
+from backend.storage.database import init_db
+
+
+def main() -> int:
+    init_db()
+
+    if "--check" in sys.argv:
+        ensure_aggregates()
+    else:
+        rounds = rebuild_aggregates()
+        print(f"Rebuilt aggregates from {rounds} complete rounds")
+
+    mismatches = check_aggregates()
+    if mismatches:
+        print(f"Aggregates differ from full scan: {', '.join(mismatches)}")
+        return 1
+    print("Aggregates match full scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
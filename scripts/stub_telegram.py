@@ -0,0 +1,70 @@
+"""Offline stand-in for the Telegram Bot API.
+
+StubRequest plugs into python-telegram-bot in place of its HTTP client and
+answers the Bot API calls the bot makes with canned results, so the real
+Application and handlers can be driven without a network or a bot token.
+"""
+
+import itertools
+import json
+import time
+
+from telegram.request import BaseRequest, RequestData
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Shortgame", "username": "shortgame_stub_bot"}
+
+_message_ids = itertools.count(1)
+
+
+def _message(params: dict) -> dict:
+    chat_id = params.get("chat_id", 0)
+    return {
+        "message_id": params.get("message_id") or next(_message_ids),
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+        "text": params.get("text", ""),
+    }
+
+
+def api_result(method: str, params: dict):
+    """Result of a Bot API call, as Telegram would return it in "result"."""
+    if method == "getMe":
+        return BOT_USER
+    if method in ("sendMessage", "editMessageText"):
+        return _message(params)
+    if method == "getUpdates":
+        return []
+    # answerCallbackQuery, setWebhook, deleteWebhook, setMyCommands, ...
+    return True
+
+
+class StubRequest(BaseRequest):
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def read_timeout(self) -> float | None:
+        return None
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        self.calls[api_method] = self.calls.get(api_method, 0) + 1
+        params = request_data.parameters if request_data else {}
+        body = {"ok": True, "result": api_result(api_method, params)}
+        return 200, json.dumps(body).encode()
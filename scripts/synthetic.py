@@ -0,0 +1,60 @@
+"""Reproducible synthetic round histories for benchmarks.
+
+First putt distances, outcomes and leave distances are drawn from the seed
+model in scripts/construct_seed.py, so synthetic stats look like real ones.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Iterator
+
+from scripts.construct_seed import LEAVE_POOLS, OUTCOMES
+
+_DISTANCES = list(OUTCOMES)
+_WEIGHTS = [n for n, _, _, _ in OUTCOMES.values()]
+
+
+def _hole(rng: random.Random, hole_number: int) -> dict:
+    first = rng.choices(_DISTANCES, weights=_WEIGHTS)[0]
+    _, makes, twos, threes = OUTCOMES[first]
+    putts_taken = rng.choices([1, 2, 3], weights=[makes, twos, threes])[0]
+
+    dists = [first]
+    while len(dists) < putts_taken:
+        dists.append(rng.choice(LEAVE_POOLS.get(dists[-1], ["3ft"])))
+
+    return {
+        "hole_number": hole_number,
+        "gir": rng.random() < 0.47,
+        "putts_taken": putts_taken,
+        "putts": [{"putt_number": i + 1, "distance": d} for i, d in enumerate(dists)],
+    }
+
+
+def generate_rounds(
+    total_holes: int,
+    users: int = 1,
+    seed: int = 0,
+    nine_hole_share: float = 0.1,
+    end: date | None = None,
+) -> Iterator[dict]:
+    """Yield rounds in the seed fixture format until `total_holes` are produced.
+
+    Rounds are spread over `users` players (telegram_user_id "1".."N") and one
+    round per player per day going backwards from `end` (default today).
+    """
+    rng = random.Random(seed)
+    today = end or date.today()
+    produced = 0
+    n = 0
+    while produced < total_holes:
+        hole_count = 9 if rng.random() < nine_hole_share else 18
+        user = n % users + 1
+        yield {
+            "telegram_user_id": str(user),
+            "date": (today - timedelta(days=n // users)).isoformat(),
+            "course_name": f"Synthetic Round {n + 1}",
+            "holes": [_hole(rng, h + 1) for h in range(hole_count)],
+        }
+        produced += hole_count
+        n += 1